@@ -1 +1 @@
-__version__ = '0.0.1'
+from qprobing._version import __version__  # noqa: F401
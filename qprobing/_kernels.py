@@ -0,0 +1,55 @@
+"""This module provides the numeric kernels for aggregating quantities over filter bins.
+
+If numba is installed, the kernels are compiled just in time and run in parallel over the results.
+Otherwise, equivalent NumPy implementations are used.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # numba is an optional dependency
+    numba = None
+
+
+def bin_sum_count(values, bin_ids, mask, n_bins):
+    """Sums up and counts the values that fall into each bin.
+
+    Args:
+        values: A numpy array of floats.
+        bin_ids: A numpy array of integers in [0, n_bins) holding the bin of each value.
+        mask: A boolean numpy array indicating which values should be used.
+        n_bins: An integer indicating the number of bins.
+
+    Returns:
+        A tuple of numpy arrays of length n_bins, holding the sum and the number of the used values in each bin.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    bin_ids = np.ascontiguousarray(bin_ids, dtype=np.intp)
+    mask = np.ascontiguousarray(mask, dtype=np.bool_)
+    if numba is None:
+        return _bin_sum_count_numpy(values, bin_ids, mask, n_bins)
+    return _bin_sum_count_numba(values, bin_ids, mask, n_bins, numba.get_num_threads())
+
+
+def _bin_sum_count_numpy(values, bin_ids, mask, n_bins):
+    used_bin_ids = bin_ids[mask]
+    sums = np.bincount(used_bin_ids, weights=values[mask], minlength=n_bins)
+    counts = np.bincount(used_bin_ids, minlength=n_bins)
+    return sums, counts
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _bin_sum_count_numba(values, bin_ids, mask, n_bins, n_chunks):
+        # Each chunk accumulates into its own row, so the threads never write to the same bin.
+        n_values = values.shape[0]
+        chunk_size = (n_values + n_chunks - 1) // n_chunks
+        sums = np.zeros((n_chunks, n_bins), dtype=np.float64)
+        counts = np.zeros((n_chunks, n_bins), dtype=np.int64)
+        for chunk in numba.prange(n_chunks):
+            for i in range(chunk * chunk_size, min(n_values, (chunk + 1) * chunk_size)):
+                if mask[i]:
+                    sums[chunk, bin_ids[i]] += values[i]
+                    counts[chunk, bin_ids[i]] += 1
+        return sums.sum(axis=0), counts.sum(axis=0)
@@ -5,10 +5,14 @@ It runs the standard version of an analysis with the goal of estimating a target
 well as some other effects that are used for quantitative probing.
 """
 
+import os
 import pathlib
 import contextlib
-from cause2e import path_mgr, knowledge
-from qprobing.custom_cause2e import CustomLearner
+from joblib import Parallel, delayed
+from qprobing.analysis_evaluator import AnalysisEvaluator
+
+
+_DEVNULL = open(os.devnull, 'w')  # opened once per process and shared by all analyses
 
 
 class AnalysisRunner:
@@ -20,8 +24,9 @@ class AnalysisRunner:
     def __init__(self, data_path, treatment, outcome, hints=set(), probes=set()):
         self._treatment = treatment
         self._outcome = outcome
-        self._hints = hints
-        self._probes = probes
+        # deduplicated once in a stable order, so that later passes only iterate
+        self._hints = tuple(dict.fromkeys(hints))
+        self._probes = tuple(dict.fromkeys(probes))
         self._data_path = data_path
 
     @classmethod
@@ -44,7 +49,7 @@ class AnalysisRunner:
         self.learner.read_csv(index_col=0)
         self._specify_datatypes()
         self._specify_knowledge()
-        with contextlib.redirect_stdout(None):
+        with contextlib.redirect_stdout(_DEVNULL):
             self.learner.run_quick_search(
                 verbose=False,
                 show_graph=False,
@@ -55,6 +60,10 @@ class AnalysisRunner:
         self._run_selected_estimations()
 
     def _create_learner(self):
+        # cause2e is imported lazily, so that sweep workers only pay for it when they run an analysis
+        from cause2e import path_mgr
+        from qprobing.custom_cause2e import CustomLearner
+
         data_dir, data_name = self._split_data_path()
         paths = path_mgr.PathManager(experiment_name='random_dag',
                                      data_name=data_name,
@@ -88,12 +97,16 @@ class AnalysisRunner:
         )
 
     def _get_edge_creator(self):
+        from cause2e import knowledge
+
         edge_creator = knowledge.EdgeCreator()
         for hint in self._hints:
             edge_creator.require_edge(*hint)
         return edge_creator
 
     def _get_validation_creator(self):
+        from cause2e import knowledge
+
         validation_creator = knowledge.ValidationCreator()
         for probe in self._probes:
             validation_creator.add_expected_effect(*probe)
@@ -113,10 +126,38 @@ class AnalysisRunner:
             self.learner._estimator._result_mgr.validate_effect(effect)
 
     def _collect_effects_of_interest(self):
-        probe_specs = {self._get_treatment_and_outcome_from_probe(probe) for probe in self._probes}
-        target_spec = (self._treatment, self._outcome)
-        return probe_specs | {target_spec}
+        probe_specs = dict.fromkeys(self._get_treatment_and_outcome_from_probe(probe) for probe in self._probes)
+        probe_specs[(self._treatment, self._outcome)] = None
+        return probe_specs.keys()
 
     @staticmethod
     def _get_treatment_and_outcome_from_probe(probe):
         return probe[0][0:2]
+
+
+def run_sweep(configs, n_jobs=-1, verbose=False):
+    """Runs and evaluates multiple independent causal analyses in parallel.
+
+    Each analysis runs in a worker process with its own Java VM. The VM cannot be restarted after
+    it has been stopped, so it stays alive between the analyses of a worker and is torn down when
+    the worker process exits.
+
+    Args:
+        configs (iterable): Contains (data_path, task_preparator) pairs, one for each analysis.
+        n_jobs (int, optional): The number of worker processes. Defaults to -1, which uses all cores.
+        verbose (bool, optional): Determines whether the result of each analysis is displayed. Defaults to False.
+
+    Returns:
+        A list containing the evaluated AnalysisEvaluator of each analysis, in the order of the configs.
+    """
+    return Parallel(n_jobs=n_jobs, backend='loky')(
+        delayed(_run_one)(data_path, task_preparator, verbose) for data_path, task_preparator in configs
+    )
+
+
+def _run_one(data_path, task_preparator, verbose):
+    runner = AnalysisRunner.from_task_preparator(data_path, task_preparator)
+    runner.run_analysis(keep_vm=True)
+    evaluator = AnalysisEvaluator.from_runner_and_preparator(runner, task_preparator)
+    evaluator.evaluate_analysis(verbose)
+    return evaluator
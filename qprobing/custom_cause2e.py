@@ -1,8 +1,12 @@
 """This module extends cause2e functionality to match the needs of our experiments."""
 
+import re
 from cause2e import discovery, estimator
 
 
+_EDGE_RE = re.compile(r"(\S+)\s*(->|<-)\s*(\S+)")
+
+
 class CustomLearner(discovery.StructureLearner):
     """Custom version of the cause2e.discovery.StructureLearner.
 
@@ -10,9 +14,22 @@ class CustomLearner(discovery.StructureLearner):
         - Passing result of the causal discovery to the estimator without saving to a file.
         - Orienting all unoriented edges after causal discovery randomly.
     """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._dot_cache = None
+        self._dot_cache_key = None
+
     def _create_estimator(self):
         self._estimator = CustomEstimator.from_learner(self, same_data=True)
-        self._estimator._dot_str = self._reformat_dot(str(self.graph.dot))
+        self._estimator._dot_str = self._get_dot_str()
+
+    def _get_dot_str(self):
+        # The graph is only modified before the estimations, so identity and size suffice as a key
+        key = (id(self.graph), len(self.graph.edges))
+        if key != self._dot_cache_key:
+            self._dot_cache = self._reformat_dot(str(self.graph.dot))
+            self._dot_cache_key = key
+        return self._dot_cache
 
     def _reformat_dot(self, dot_str):
         front = "digraph {"
@@ -21,12 +38,8 @@ class CustomLearner(discovery.StructureLearner):
         return front + ";".join(edges) + end
 
     def _get_edges(self, dot_str):
-        graph_particles = dot_str.replace("\n", " ").replace("G", " ").split(" ")
-        edges = []
-        for i, particle in enumerate(graph_particles):
-            if particle in {'->', '<-'}:  # Assumes that undirected edges have been oriented
-                edges.append(" ".join([graph_particles[i - 1], particle, graph_particles[i + 1]]))
-        return edges
+        # Assumes that undirected edges have been oriented
+        return [f"{m[1]} {m[2]} {m[3]}" for m in _EDGE_RE.finditer(dot_str)]
 
     def orient_all_edges(self, verbose=False):
         """Orients all unoriented edges randomly.
@@ -5,9 +5,11 @@ The graphs are constructed as Erdos Renyi graphs: a number of nodes and an edge
 specified, which determines the probability of an edge being present between any pair of nodes.
 """
 
+from itertools import chain
+
+import numpy as np
 import networkx as nx
 import networkx.generators.random_graphs as rg
-from cause2e import _graph
 
 
 class DagGenerator:
@@ -30,70 +32,93 @@ class DagGenerator:
         self.seed = seed
         self.max_count = max_count
 
-    def exception_handler(func):
-        def inner_function(*args, **kwargs):
+    def retry_handler(func):
+        def inner_function(self, *args, **kwargs):
             count = 0
-            success = False
-            self = args[0]
             self.cyclic_graph_errors = 0
             self.isolated_node_errors = 0
-            while not success and count < self.max_count:
+            while count < self.max_count:
                 count += 1
                 if self.seed:
                     self.seed += 1  # TODO: Is it ok to shift the seed up? Analyze how many subsequent dags are the same
-                try:
-                    func(*args, **kwargs)
-                except CyclicGraphError:
+                error = func(self, *args, **kwargs)
+                if error is None:
+                    return
+                if error == 'cyclic':
                     self.cyclic_graph_errors += 1
-                except IsolatedNodeError:
+                elif error == 'isolated':
                     self.isolated_node_errors += 1
-                else:  # What if other errors happen?
-                    success = True
-            if not success:
-                raise TooManyAttemptsError(f"No success in random dag generation after {self.max_count} attempts.")
+            raise TooManyAttemptsError(f"No success in random dag generation after {self.max_count} attempts.")
         return inner_function
 
-    @exception_handler
-    def create_random_dag(self, force_n_vars=True, show=True):
+    @retry_handler
+    def create_random_dag(self, force_n_vars=True, show=True, acyclic_sampling=False):
         """Creates a random directed acyclic graph.
 
         Args:
+            force_n_vars: A boolean indicating if graphs with isolated nodes should be rejected.
+                Defaults to True.
             show: A boolean indicating if the graph should be shown. Defaults to True.
+            acyclic_sampling: A boolean indicating if the edges should only be drawn in the
+                direction of a random node ordering. This yields a DAG in every attempt, but the
+                graphs differ from the rejection-sampled Erdos Renyi graphs for the same seed.
+                Defaults to False.
         """
-        nx_graph = rg.erdos_renyi_graph(self.n_vars, self.p_edge, seed=self.seed, directed=True)
-        self._postprocess_nx_graph(nx_graph, force_n_vars=force_n_vars)
-        if show:
+        if acyclic_sampling:
+            nx_graph = self._sample_acyclic_nx_graph(force_n_vars=force_n_vars)
+            if nx_graph is None:
+                return 'isolated'
+            error = self._postprocess_nx_graph(nx_graph, force_dag=False, force_n_vars=False)
+        else:
+            nx_graph = rg.erdos_renyi_graph(self.n_vars, self.p_edge, seed=self.seed, directed=True)
+            error = self._postprocess_nx_graph(nx_graph, force_n_vars=force_n_vars)
+        if error is None and show:
             self.show_graph()
-
-    def _postprocess_nx_graph(self, nx_graph, force_n_vars=True):
+        return error
+
+    def _sample_acyclic_nx_graph(self, force_n_vars=True):
+        rng = np.random.default_rng(self.seed)
+        adj = _sample_dag_adj(self.n_vars, self.p_edge, rng)
+        if force_n_vars and _has_isolated_nodes(adj):
+            return None
+        order = rng.permutation(self.n_vars).tolist()  # hides the sampling order from the node names
+        nx_graph = nx.DiGraph()
+        nx_graph.add_nodes_from(range(self.n_vars))
+        nx_graph.add_edges_from((order[source], order[dest]) for source, dest in np.argwhere(adj))
+        return nx_graph
+
+    def _postprocess_nx_graph(self, nx_graph, force_dag=True, force_n_vars=True):
         self._extract_graph_attributes(nx_graph)
-        self._check_nx_graph(force_dag=True, force_n_vars=force_n_vars)
+        return self._find_graph_error(force_dag=force_dag, force_n_vars=force_n_vars)
 
     def _extract_graph_attributes(self, nx_graph):
-        mapping = {node: f"x{node}" for node in nx_graph.nodes}
-        self.nx_graph = nx.relabel.relabel_nodes(nx_graph, mapping)
-        self.edges = set(self.nx_graph.edges)
+        # Builds the relabeled graph directly instead of copying it via nx.relabel_nodes
+        edges = [(f"x{source}", f"x{dest}") for source, dest in nx_graph.edges]
+        self.nx_graph = nx.DiGraph()
+        self.nx_graph.add_nodes_from(f"x{node}" for node in nx_graph.nodes)
+        self.nx_graph.add_edges_from(edges)
+        self.edges = set(edges)
         self.nodes = get_nodes_from_edges(self.edges)
 
-    def _check_nx_graph(self, force_dag=True, force_n_vars=True):
-        if force_dag:
-            self._check_acyclicity()
-        if force_n_vars:
-            self._check_isolated_nodes()
+    def _find_graph_error(self, force_dag=True, force_n_vars=True):
+        # Returns a tag instead of raising, because rejections are the normal case in the retry loop
+        if force_dag and not self._is_acyclic():
+            return 'cyclic'
+        if force_n_vars and self._has_isolated_nodes():
+            return 'isolated'
+        return None
 
-    def _check_acyclicity(self):
-        if not nx.is_directed_acyclic_graph(self.nx_graph):
-            msg = 'The graph is not acyclic.'
-            raise CyclicGraphError(msg)
+    def _is_acyclic(self):
+        return nx.is_directed_acyclic_graph(self.nx_graph)
 
-    def _check_isolated_nodes(self):
+    def _has_isolated_nodes(self):
         self.isolated_nodes = not len(self.nodes) == self.n_vars
-        if self.isolated_nodes:
-            msg = 'The number of non-isolated nodes is smaller than the desired number of variables.'
-            raise IsolatedNodeError(msg)
+        return self.isolated_nodes
 
     def show_graph(self):
         """Shows the graph."""
+        from cause2e import _graph  # imported lazily, because showing is optional
+
         cause2e_graph = _graph.Graph.from_edges(directed_edges=self.edges, undirected_edges=set())
         cause2e_graph.show()
 
@@ -104,10 +129,16 @@ def get_nodes_from_edges(edges):
     Args:
         edges: A set indicating the edges of the graph.
     """
-    nodes = set()
-    for source, dest in edges:
-        nodes |= {source, dest}
-    return nodes
+    return set(chain.from_iterable(edges))
+
+
+def _sample_dag_adj(n_vars, p_edge, rng):
+    """Returns a random strictly upper triangular adjacency matrix, which is acyclic by construction."""
+    return (rng.random((n_vars, n_vars)) < p_edge) & np.triu(np.ones((n_vars, n_vars), dtype=bool), k=1)
+
+
+def _has_isolated_nodes(adj):
+    return ((adj.sum(axis=0) + adj.sum(axis=1)) == 0).any()
 
 
 class IsolatedNodeError(Exception):
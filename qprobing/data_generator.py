@@ -7,10 +7,12 @@ sample data points according to the specified distribution. The results can be w
 for futher processing.
 """
 
+import io
+import csv
+import collections
 import numpy as np
+import pandas as pd
 import networkx as nx
-from pgmpy.factors.discrete import TabularCPD
-from pgmpy.models import BayesianNetwork
 from qprobing.dag_generator import DagGenerator, get_nodes_from_edges
 
 
@@ -31,6 +33,7 @@ class DataGenerator:
         self.edges = edges
         self.nodes = get_nodes_from_edges(edges)
         self.nx_graph = nx.DiGraph(edges)
+        self._parents = self._collect_parents()
 
     @classmethod
     def from_nx_graph(cls, nx_graph):
@@ -53,27 +56,43 @@ class DataGenerator:
         Args:
             seed: optional; An integer indicating the seed for creating cpds. Defaults to None.
         """
+        from pgmpy.models import BayesianNetwork  # imported lazily to keep worker start-up cheap
+
         self.model = BayesianNetwork(self.edges)
-        cpds = self._create_random_binary_cpds(seed=seed)
+        self._vals = self._draw_random_vals(seed=seed)
+        cpds = self._create_random_binary_cpds()
         self.model.add_cpds(*cpds)
-
-    def _create_random_binary_cpds(self, seed=None):
-        return {self._create_random_binary_cpd(node, seed) for node in self.nodes}
-
-    def _create_random_binary_cpd(self, node, seed=None):
-        vals = self._get_vals(node, seed)
-        parents = self._get_parents(node)
-        return create_binary_cpd(node, vals, parents)
-
-    def _get_vals(self, node, seed=None):
-        parents = self._get_parents(node)
-        np.random.seed(seed)  # is this problematic?
-        return np.random.uniform(0, 1, 2 ** len(parents))
+        self._sampling_plan = self._build_sampling_plan()
+
+    def _draw_random_vals(self, seed=None):
+        # sorted iteration keeps the mapping from random draws to cpd entries independent of set ordering
+        nodes = sorted(self.nodes)
+        sizes = [2 ** len(self._get_parents(node)) for node in nodes]
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        # one contiguous block holds the full value table of every cpd, rows are P(node=0) and P(node=1)
+        block = np.empty((2, offsets[-1]))
+        np.random.default_rng(seed).random(offsets[-1], out=block[1])
+        np.subtract(1.0, block[1], out=block[0])
+        self._cpd_values = {node: block[:, start:end] for node, start, end in zip(nodes, offsets[:-1], offsets[1:])}
+        return {node: values[1] for node, values in self._cpd_values.items()}
+
+    def _create_random_binary_cpds(self):
+        return [self._create_random_binary_cpd(node) for node in sorted(self.nodes)]
+
+    def _create_random_binary_cpd(self, node):
+        parents = sorted(self._get_parents(node))
+        return _create_tabular_cpd(node, self._cpd_values[node], parents)
 
     def _get_parents(self, node):
-        return {source for source, dest in self.edges if dest == node}
+        return self._parents[node]
 
-    def generate_data(self, n_samples, seed=None, save_to_file=None):
+    def _collect_parents(self):
+        parents = collections.defaultdict(set)
+        for source, dest in self.edges:
+            parents[dest].add(source)
+        return parents
+
+    def generate_data(self, n_samples, seed=None, save_to_file=None, backend='numpy'):
         """Generated simulated data from the model.
 
         Args:
@@ -81,29 +100,91 @@ class DataGenerator:
             seed: optional; An integer indicating the seed for data generation. Defaults to None.
             save_to_file: optional; A string indicating the name of the csv file for saving.
                 Defaults to None.
+            backend: optional; A string indicating the sampler. 'numpy' uses a vectorized ancestral
+                sampler for the binary cpds, 'pgmpy' uses the general BayesianNetwork.simulate.
+                Both sample from the same distribution, but give different data for the same seed.
+                Defaults to 'numpy'.
 
         Raises:
             MissingModelError
+            InvalidBackendError
         """
         if not hasattr(self, 'model'):
             raise MissingModelError('You have to create a model before you can generate data from it.')
-        self.data = self.model.simulate(n_samples=n_samples, seed=seed, show_progress=False)
+        if backend == 'numpy':
+            self.data = self._fast_simulate(n_samples, seed)
+        elif backend == 'pgmpy':
+            self.data = self.model.simulate(n_samples=n_samples, seed=seed, show_progress=False)
+        else:
+            raise InvalidBackendError(f"Unknown simulation backend '{backend}'. Use 'numpy' or 'pgmpy'.")
         if save_to_file:
-            self.data.to_csv(save_to_file)
+            write_csv(self.data, save_to_file)
+
+    def _build_sampling_plan(self):
+        # precomputed once per model, so that repeated simulations only do the sampling itself
+        nodes = list(nx.lexicographical_topological_sort(self.nx_graph))
+        columns = {node: j for j, node in enumerate(nodes)}
+        plan = []
+        for node in nodes:
+            parent_idx = np.array([columns[parent] for parent in sorted(self._get_parents(node))], dtype=np.intp)
+            # the first evidence variable of a TabularCPD is the most significant one in the column index
+            strides = (1 << np.arange(len(parent_idx), dtype=np.int32)[::-1]).astype(np.int32)
+            plan.append((node, parent_idx, strides, self._vals[node].astype(np.float32)))
+        return plan
+
+    def _fast_simulate(self, n_samples, seed=None):
+        rng = np.random.default_rng(seed)
+        nodes = [node for node, _, _, _ in self._sampling_plan]
+        out = np.empty((n_samples, len(nodes)), dtype=np.uint8)
+        for j, (_, parent_idx, strides, vals) in enumerate(self._sampling_plan):
+            idx = out[:, parent_idx] @ strides
+            out[:, j] = rng.random(n_samples, dtype=np.float32) < vals[idx]
+        return pd.DataFrame(out, columns=nodes)[sorted(nodes)]
 
 
 def create_binary_cpd(node, vals, parents):
+    vals = np.asarray(vals, dtype=np.float64)
+    return _create_tabular_cpd(node, np.vstack((1.0 - vals, vals)), parents)
+
+
+def _create_tabular_cpd(node, values, parents):
+    from pgmpy.factors.discrete import TabularCPD
+
     return TabularCPD(
         variable=node,
         variable_card=2,
-        values=[
-            [1 - val for val in vals],
-            vals,
-        ],
-        evidence=parents,
-        evidence_card=[2 for _ in parents]
+        values=values,
+        evidence=list(parents) or None,
+        evidence_card=[2] * len(parents) or None,
     )
 
 
+def write_csv(data, path):
+    """Writes a dataframe including its index to a csv file, using pyarrow's multithreaded writer if available.
+
+    Args:
+        data: A pandas.DataFrame.
+        path: A string or path indicating the name of the csv file.
+    """
+    try:
+        import pyarrow as pa  # imported lazily, because it is optional and slow to import
+        import pyarrow.csv as pacsv
+    except ImportError:
+        data.to_csv(path, chunksize=100_000)
+        return
+    # pyarrow quotes all header names, so the header is written like pandas does and the rows are appended
+    header = io.StringIO()
+    csv.writer(header, lineterminator='\n').writerow([data.index.name or '', *data.columns])
+    arrays = [data.index.to_numpy(), *(data.iloc[:, j].to_numpy() for j in range(data.shape[1]))]
+    table = pa.Table.from_arrays(arrays, names=[str(j) for j in range(len(arrays))])
+    with open(path, 'wb') as f:
+        f.write(header.getvalue().encode())
+        pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=False))
+
+
 class MissingModelError(Exception):
     pass
+
+
+class InvalidBackendError(Exception):
+    pass
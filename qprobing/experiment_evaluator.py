@@ -1,6 +1,15 @@
 """This module provides the main functionality for evaluating quantitative probing experiments."""
 
+import io
+import os
+import json
 import pickle
+import hashlib
+import reprlib
+import functools
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+import pathlib
 import numpy as np
 import matplotlib.pyplot as plt
 from qprobing.experiment_result import ExperimentResult
@@ -9,34 +18,68 @@ from qprobing.results_filter import ResultsFilter
 
 class ExperimentEvaluator:
     """Main class for evaluating the results of several quantitative probing experiment runs."""
-    def __init__(self, results_list, filter_params={}):
-        unpacker = ResultUnpacker(results_list, filter_params)
+    def __init__(self, results_list, filter_params=None):
+        unpacker = ResultUnpacker(results_list, filter_params or {})
         unpacker.unpack_results()
-        for attribute_name in vars(unpacker):
-            attribute = getattr(unpacker, attribute_name)
-            setattr(self, attribute_name, attribute)
+        self.__dict__.update(vars(unpacker))
 
     @classmethod
-    def from_experiment_runner(cls, runner, filter_params={}):
+    def from_experiment_runner(cls, runner, filter_params=None):
         return cls(runner.results_list, filter_params)
 
     @classmethod
-    def from_pkl(cls, filename, filter_params={}):
-        with open(filename, 'rb') as f:
-            results_list = pickle.load(f)
-        return cls(results_list, filter_params)
+    def from_pkl(cls, filename, filter_params=None, cache_dir=None):
+        """Alternative constructor using the results from a pkl file.
+
+        Args:
+            filename: A string or path indicating the pkl file.
+            filter_params: optional; A dict containing the filter parameters. Defaults to None,
+                meaning no filters.
+            cache_dir: optional; A string or path indicating a directory for caching the unpacked
+                quantities as npz files. See from_multiple_pkls for the restrictions of a cached
+                evaluator. Defaults to None, meaning no caching.
+        """
+        if cache_dir is not None:
+            return cls.from_multiple_pkls([filename], filter_params, cache_dir)
+        return cls(load_results(filename), filter_params)
 
     @classmethod
-    def from_multiple_pkls(cls, filenames, filter_params={}):
-        results_list = []
-        for filename in filenames:
-            with open(filename, 'rb') as f:
-                results_list += pickle.load(f)
-        return cls(results_list, filter_params)
+    def from_multiple_pkls(cls, filenames, filter_params=None, cache_dir=None):
+        """Alternative constructor using the results from multiple pkl files.
+
+        Args:
+            filenames: A list of strings or paths indicating the pkl files.
+            filter_params: optional; A dict containing the filter parameters. Defaults to None,
+                meaning no filters.
+            cache_dir: optional; A string or path indicating a directory for caching the unpacked
+                quantities as npz files. A cached evaluator skips unpickling, but it only provides the
+                numeric quantities and the result counts. This also holds for the call that creates
+                the cache, so that the result does not depend on whether the cache existed. Accessing
+                anything else raises a NotCachedError. Defaults to None, meaning no caching.
+        """
+        if cache_dir is None:
+            return cls(load_multiple_results(filenames), filter_params)
+        cache_path = _get_cache_path(cache_dir, filenames, filter_params or {})
+        if not cache_path.exists():
+            cls(load_multiple_results(filenames), filter_params)._to_npz(cache_path)
+        return cls._from_npz(cache_path)
+
+    @staticmethod
+    def _from_npz(path):
+        evaluator = _CachedExperimentEvaluator.__new__(_CachedExperimentEvaluator)
+        with np.load(path) as cached:
+            for name in cached.files:
+                value = cached[name]
+                setattr(evaluator, name, value.item() if value.ndim == 0 else value)
+        return evaluator
+
+    def _to_npz(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **{name: getattr(self, name) for name in _CACHED_ATTRIBUTES})
 
     def get_mean(self, attribute_name):
         attribute = self.get_data(attribute_name)
-        return np.nanmean(attribute)
+        return np.nanmean(attribute, dtype=np.float64)
 
     def get_data(self, attribute_name):
         return getattr(self, f"_{attribute_name}")  # TODO: Decide if the attributes are public or not
@@ -48,113 +91,148 @@ class ExperimentEvaluator:
 
     def show_ordinary_results_info(self):
         """Shows how many of the experiment runs were completed without exceptions."""
-        print(f"{self._n_ordinary_results} ordinary results vs. {self._n_exceptional_results} exceptional results.")
+        print(self._ordinary_results_summary)
 
     def show_valid_results_info(self):
         """Shows how many of the ordinary experiment runs met the filter criteria."""
-        print(f"{self._n_valid_results} in-spec results vs. {self._n_invalid_results} out-of-spec results.")
+        print(self._valid_results_summary)
 
-    def show_exceptional_results(self):
-        """Shows all exceptional results to help us analyze the problems with these runs."""
-        print(self._exceptional_results)
+    def show_exceptional_results(self, limit=20):
+        """Shows the exceptional results to help us analyze the problems with these runs.
 
-    def show_invalid_results(self):
-        """Shows all invalid results to help us analyze the problems with these runs."""
-        print(self._invalid_results)
+        Args:
+            limit: optional; An integer indicating how many results are shown before the output is
+                truncated. Defaults to 20.
+        """
+        print(_truncated_repr(self._exceptional_results, limit))
+
+    def show_invalid_results(self, limit=20):
+        """Shows the invalid results to help us analyze the problems with these runs.
+
+        Args:
+            limit: optional; An integer indicating how many results are shown before the output is
+                truncated. Defaults to 20.
+        """
+        print(_truncated_repr(self._invalid_results, limit))
+
+    @functools.cached_property
+    def _ordinary_results_summary(self):
+        return f"{self._n_ordinary_results} ordinary results vs. {self._n_exceptional_results} exceptional results."
+
+    @functools.cached_property
+    def _valid_results_summary(self):
+        return f"{self._n_valid_results} in-spec results vs. {self._n_invalid_results} out-of-spec results."
 
     def show_all_plots(self):
-        """Calls all public plot methods of the evaluator."""
-        self.plot_n_edge_differences_vs_hit_rates()
-        self.plot_absolute_effect_differences_vs_hit_rates()
-        self.plot_relative_effect_differences_vs_hit_rates()
-        self.plot_effect_differences_vs_hit_rates()
-        self.plot_correct_graph_founds_vs_hit_rates()
-
-    def plot_correct_graph_founds_vs_hit_rates(self, plotting_options={}):
+        """Calls all public plot methods of the evaluator, drawing them as subplots of one figure."""
+        fig, axs = plt.subplots(2, 3, figsize=(15, 8))
+        self.plot_n_edge_differences_vs_hit_rates({'ax': axs[0, 0]})
+        self.plot_absolute_effect_differences_vs_hit_rates({'ax': axs[0, 1]})
+        self.plot_relative_effect_differences_vs_hit_rates({'ax': axs[0, 2]})
+        self.plot_effect_differences_vs_hit_rates({'ax': axs[1, 0]})
+        self.plot_correct_graph_founds_vs_hit_rates({'ax': axs[1, 1]})
+        fig.delaxes(axs[1, 2])
+        fig.tight_layout()
+        plt.show(block=False)
+
+    def plot_correct_graph_founds_vs_hit_rates(self, plotting_options=None):
         """Plots the causal discovery results (successful or not) against the
         hit rates.
 
         Args:
             plotting_options: A dict containing plotting options.
-                Currently available: x_label, y_label, title, png_name, y_lims.
+                Currently available: x_label, y_label, title, png_name, y_lims, opacity, ax.
+                If an ax is given, the plot is drawn into it and not shown immediately.
         """
         self._plot_metric_vs_hit_rates('_correct_graph_founds', plotting_options)
 
-    def plot_n_edge_differences_vs_hit_rates(self, plotting_options={}):
+    def plot_n_edge_differences_vs_hit_rates(self, plotting_options=None):
         """Plots the number of edges that differ between discovery result and true graph against the
         hit rates.
 
         Args:
             plotting_options: A dict containing plotting options.
-                Currently available: x_label, y_label, title, png_name, y_lims.
+                Currently available: x_label, y_label, title, png_name, y_lims, opacity, ax.
+                If an ax is given, the plot is drawn into it and not shown immediately.
         """
         self._plot_metric_vs_hit_rates('_n_edge_differences', plotting_options)
 
-    def plot_absolute_effect_differences_vs_hit_rates(self, plotting_options={}):
+    def plot_absolute_effect_differences_vs_hit_rates(self, plotting_options=None):
         """Plots the absolute difference between the estimated and true target effect against the
         hit rates.
 
         Args:
             plotting_options: A dict containing plotting options.
-                Currently available: x_label, y_label, title, png_name, y_lims.
+                Currently available: x_label, y_label, title, png_name, y_lims, opacity, ax.
+                If an ax is given, the plot is drawn into it and not shown immediately.
         """
         self._plot_metric_vs_hit_rates('_absolute_effect_differences', plotting_options)
 
-    def plot_relative_effect_differences_vs_hit_rates(self, plotting_options={}):
+    def plot_relative_effect_differences_vs_hit_rates(self, plotting_options=None):
         """Plots the absolute difference between the estimated and true target effect against the
         hit rates.
 
         Args:
             plotting_options: A dict containing plotting options.
-                Currently available: x_label, y_label, title, png_name, y_lims.
+                Currently available: x_label, y_label, title, png_name, y_lims, opacity, ax.
+                If an ax is given, the plot is drawn into it and not shown immediately.
         """
         self._plot_metric_vs_hit_rates('_relative_effect_differences', plotting_options)
 
-    def plot_effect_differences_vs_hit_rates(self, plotting_options={}):
+    def plot_effect_differences_vs_hit_rates(self, plotting_options=None):
         """Plots the  difference between the estimated and true target effect against the
         hit rates.
 
         Args:
             plotting_options: A dict containing plotting options.
-                Currently available: x_label, y_label, title, png_name, y_lims.
+                Currently available: x_label, y_label, title, png_name, y_lims, opacity, ax.
+                If an ax is given, the plot is drawn into it and not shown immediately.
         """
         self._plot_metric_vs_hit_rates('_effect_differences', plotting_options)
 
-    def _plot_metric_vs_hit_rates(self, metric_name, plotting_options={}):
+    def _plot_metric_vs_hit_rates(self, metric_name, plotting_options=None):
         self._plot('_hit_rates', metric_name, plotting_options)
 
-    def _plot(self, x_name, y_name, plotting_options={}):
+    def _plot(self, x_name, y_name, plotting_options=None):
+        plotting_options = plotting_options or {}
         x_data = getattr(self, x_name)
         y_data = getattr(self, y_name)
-        if 'opacity' in plotting_options:
-            alpha = plotting_options['opacity']
-        else:
-            alpha = 1
-        plt.scatter(x_data, y_data, alpha=alpha)
+        ax = plotting_options.get('ax')
+        show = ax is None
+        if show:
+            ax = plt.gca()
+        alpha = plotting_options.get('opacity', 1)
+        ax.scatter(x_data, y_data, alpha=alpha)
         x_default = x_name
-        x_label = plotting_options.get('x_label', x_default)
-        plt.xlabel(x_label)
+        ax.set_xlabel(plotting_options.get('x_label', x_default))
         y_default = y_name
-        y_label = plotting_options.get('y_label', y_default)
-        plt.ylabel(y_label)
+        ax.set_ylabel(plotting_options.get('y_label', y_default))
         title_default = f"{self._n_valid_results} valid runs with {self._n_nodes} nodes"
-        title = plotting_options.get('title', title_default)
-        plt.title(title)
+        ax.set_title(plotting_options.get('title', title_default))
         if 'y_lims' in plotting_options:
-            plt.ylim(*plotting_options['y_lims'])
+            ax.set_ylim(*plotting_options['y_lims'])
         if 'png_name' in plotting_options:
-            fig = plt.gcf()
             path = plotting_options['png_name']
-            fig.savefig(path)
+            ax.figure.savefig(path)
             print(f'Saving to {path}')
-        plt.show(block=False)
+        if show:
+            plt.show(block=False)
+
+
+class _CachedExperimentEvaluator(ExperimentEvaluator):
+    """ExperimentEvaluator restored from an npz cache, holding only the numeric quantities and the result counts."""
+    def __getattr__(self, name):
+        # only called for missing attributes, i.e. those that need the unpickled results
+        raise NotCachedError(
+            f"'{name}' is not stored in the npz cache of the evaluator. Load it without cache_dir to access it."
+        )
 
 
 class ResultUnpacker:
     """Utility class for unpacking the results of several quantitative probing runs."""
-    def __init__(self, results_list, filter_params={}):
+    def __init__(self, results_list, filter_params=None):
         self._results = results_list
-        self._filter_params = filter_params
+        self._filter_params = filter_params or {}
 
     @classmethod
     def from_experiment_runner(cls, runner):
@@ -164,28 +242,26 @@ class ResultUnpacker:
         """Unpacks the results to extract meaningful analysis quantities."""
         self._check_results_for_validity()
         self._get_n_nodes()
-        self._get_hit_rates()
-        self._get_effect_differences()
-        self._get_absolute_effect_differences()
-        self._get_relative_effect_differences()
-        self._get_target_effects()
-        self._get_correct_graph_founds()
-        self._get_edge_differences()
-        self._get_n_edge_differences()
+        self._unpack_all_attributes()
 
     def _check_results_for_validity(self):
-        self._exceptional_results = [x for x in self._results if self._check_exception(x)]
-        ordinary_result_dicts = [x for x in self._results if not self._check_exception(x)]
+        self._exceptional_results = []
+        ordinary_result_dicts = []
+        append_exceptional = self._exceptional_results.append
+        append_ordinary = ordinary_result_dicts.append
+        for result in self._results:
+            if isinstance(result, Exception):
+                append_exceptional(result)
+            else:
+                append_ordinary(result)
         self._ordinary_results = [ExperimentResult.from_result_dict(x) for x in ordinary_result_dicts]
         self._valid_results = self._get_filtered_ordinary_results()
-        self._invalid_results = [x for x in self._ordinary_results if x not in self._valid_results]
+        valid_ids = {id(x) for x in self._valid_results}  # avoids a quadratic membership test on the list
+        self._invalid_results = [x for x in self._ordinary_results if id(x) not in valid_ids]
         self._get_result_counts()
         assert self._n_valid_results + self._n_invalid_results + self._n_exceptional_results == len(self._results)
         self._collect_valid_evaluators()
 
-    def _check_exception(self, result):
-        return isinstance(result, Exception)
-
     def _get_filtered_ordinary_results(self):
         results = self._ordinary_results
         for attribute_name in self._filter_params:
@@ -196,6 +272,8 @@ class ResultUnpacker:
         params = self._filter_params[attribute_name]
         lower_bound = params.get('lower_bound', None)
         upper_bound = params.get('upper_bound', None)
+        if lower_bound is None and upper_bound is None:  # an unbounded filter lets every result pass
+            return results
         results_filter = ResultsFilter(results, attribute_name, lower_bound, upper_bound)
         results_filter.filter_results()
         return results_filter.filtered_results
@@ -212,30 +290,140 @@ class ResultUnpacker:
     def _get_n_nodes(self):
         self._n_nodes = self._valid_results[0].n_nodes
 
-    def _get_hit_rates(self):
-        self._get_attribute_list('hit_rate')
+    def _unpack_all_attributes(self):
+        # one pass over the evaluators fetches all attributes at once via a C-level attrgetter
+        n = len(self._evaluators)
+        names = list(_ATTRIBUTE_DTYPES)
+        rows = list(map(attrgetter(*names, 'edge_difference'), self._evaluators))
+        columns = list(zip(*rows)) or [()] * (len(names) + 1)
+        for name, column in zip(names, columns):
+            setattr(self, f"_{name}s", np.fromiter(column, dtype=_ATTRIBUTE_DTYPES[name], count=n))
+        self._edge_differences = list(columns[-1])
+        self._n_edge_differences = np.fromiter(map(len, self._edge_differences), dtype=np.int32, count=n)
+
+
+# float32 is plenty for rates and effects and halves the data moved into plots, means accumulate in float64
+_ATTRIBUTE_DTYPES = {
+    'hit_rate': np.float32,
+    'effect_difference': np.float32,
+    'absolute_effect_difference': np.float32,
+    'relative_effect_difference': np.float32,
+    'target_effect': np.float32,
+    'correct_graph_found': np.bool_,
+}
+
+UNPACKED_QUANTITIES = frozenset([f"{name}s" for name in _ATTRIBUTE_DTYPES] + ['n_edge_differences'])
+
+
+def unpack_quantity(evaluators, quantity_name):
+    """Returns the values of a quantity for each evaluator, as unpacked by the ResultUnpacker.
+
+    Args:
+        evaluators: A list of AnalysisEvaluators.
+        quantity_name: A string from UNPACKED_QUANTITIES, e.g. 'hit_rates'.
+
+    Returns:
+        A numpy array with one value per evaluator and the same dtype as the unpacked quantity.
+    """
+    if quantity_name == 'n_edge_differences':
+        values = (len(evaluator.edge_difference) for evaluator in evaluators)
+        return np.fromiter(values, dtype=np.int32, count=len(evaluators))
+    attribute_name = quantity_name[:-1]
+    values = map(attrgetter(attribute_name), evaluators)
+    return np.fromiter(values, dtype=_ATTRIBUTE_DTYPES[attribute_name], count=len(evaluators))
+
+
+def _truncated_repr(results, limit):
+    # avoids building the repr of every result for long result lists
+    repr_ = reprlib.Repr()
+    repr_.maxlist = limit
+    repr_.maxother = 200
+    return repr_.repr(results)
+
+
+def load_results(filename):
+    """Returns the results list stored in a pkl file.
+
+    The file can either hold one pickled results list or a stream of pickled results, as written by
+    ExperimentRunner.run_experiments_streaming. It is read in one go and unpickled from memory, which
+    avoids the many small reads of pickle.load on a file object.
+
+    Args:
+        filename: A string or path indicating the pkl file.
+    """
+    return load_results_from_bytes(_read_bytes(filename))
+
+
+def load_results_from_bytes(raw):
+    """Returns the results list stored in the bytes of a pkl file.
+
+    Like in load_results, the bytes can either hold one pickled results list or a stream of pickled results.
+
+    Args:
+        raw: A bytes object holding the contents of the pkl file.
+    """
+    # a single results list unpickles in one call, a stream of results is read until EOF
+    stream = io.BytesIO(raw)
+    results_list = []
+    while stream.tell() < len(raw):
+        obj = pickle.load(stream)
+        if isinstance(obj, list):
+            results_list.extend(obj)
+        else:
+            results_list.append(obj)
+    return results_list
+
+
+def load_multiple_results(filenames):
+    """Returns the concatenated results lists stored in multiple pkl files.
+
+    The files are read concurrently, because file reads release the GIL. Unpickling stays in the
+    calling process, as results from worker processes would have to be pickled a second time.
+
+    Args:
+        filenames: A list of strings or paths indicating the pkl files.
+    """
+    results_list = []
+    for file_results in load_results_per_file(filenames):
+        results_list.extend(file_results)
+    return results_list
+
+
+def load_results_per_file(filenames):
+    """Returns the results lists stored in multiple pkl files, one list per file.
+
+    Like in load_multiple_results, the files are read concurrently and unpickled in the calling process.
+
+    Args:
+        filenames: A list of strings or paths indicating the pkl files.
+    """
+    with ThreadPoolExecutor() as executor:
+        raw_results = list(executor.map(_read_bytes, filenames))
+    return [load_results_from_bytes(raw) for raw in raw_results]
 
-    def _get_effect_differences(self):
-        self._get_attribute_list('effect_difference')
 
-    def _get_absolute_effect_differences(self):
-        self._get_attribute_list('absolute_effect_difference')
+def _read_bytes(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
 
-    def _get_relative_effect_differences(self):
-        self._get_attribute_list('relative_effect_difference')
 
-    def _get_target_effects(self):
-        self._get_attribute_list('target_effect')
+_CACHED_ATTRIBUTES = [f"_{name}s" for name in _ATTRIBUTE_DTYPES] + [
+    '_n_edge_differences',
+    '_n_nodes',
+    '_n_exceptional_results',
+    '_n_ordinary_results',
+    '_n_valid_results',
+    '_n_invalid_results',
+]
 
-    def _get_correct_graph_founds(self):
-        self._get_attribute_list('correct_graph_found')
 
-    def _get_edge_differences(self):
-        self._get_attribute_list('edge_difference')
+def _get_cache_path(cache_dir, filenames, filter_params):
+    # modification times invalidate the cache when a pkl file is rewritten
+    sources = [[str(filename), os.path.getmtime(filename)] for filename in filenames]
+    key = json.dumps([sources, filter_params], sort_keys=True, default=str)
+    return pathlib.Path(cache_dir) / f"{hashlib.sha256(key.encode()).hexdigest()}.npz"
 
-    def _get_n_edge_differences(self):
-        self._n_edge_differences = [len(diff) for diff in self._edge_differences]
 
-    def _get_attribute_list(self, attribute_name):
-        attribute_list = [getattr(evaluator, attribute_name) for evaluator in self._evaluators]
-        setattr(self, f"_{attribute_name}s", attribute_list)
+class NotCachedError(AttributeError):
+    """Exception that is raised when an evaluator restored from the npz cache lacks the requested data."""
+    pass
@@ -3,6 +3,7 @@
 Its structure is not yet finalized.
 """
 
+import functools
 import networkx as nx
 from cause2e._graph import Graph
 from qprobing.probe_checkers import TrivialityChecker, ConnectivityChecker
@@ -17,15 +18,44 @@ class ExperimentResult:
     def __init__(self, evaluator):
         self.evaluator = evaluator
         self._get_analysis_evaluator_info()
-        self._graph_helper = _GraphHelper(self.true_graph, self.discovered_graph)
-        self.true_n_connected_components = self._graph_helper.true_n_connected_components
         self._get_nontrivial_probes_info()
-        self._get_connected_probes_info()
 
     @classmethod
     def from_result_dict(cls, result_dict):
         return cls(result_dict['evaluator'])
 
+    @functools.cached_property
+    def _graph_helper(self):
+        # built on first use, so that results which never need graph analytics skip it
+        return _GraphHelper(self.true_graph, self.discovered_graph)
+
+    @functools.cached_property
+    def true_n_connected_components(self):
+        return self._graph_helper.true_n_connected_components
+
+    # The connectivity of the probes needs the graph helper, so it is only determined on first access.
+    @property
+    def connected_probes(self):
+        return self._connected_probes_filter.filtered_probes
+
+    @property
+    def n_connected_probes(self):
+        return self._connected_probes_filter.n_filtered_probes
+
+    @property
+    def connected_probes_ratio(self):
+        return self._connected_probes_filter.filtered_probes_ratio
+
+    @functools.cached_property
+    def _connected_probes_filter(self):
+        return self._filter_probes(
+            checker_class=ConnectivityChecker,
+            valid=True,
+            graph_helper=self._graph_helper,
+            target_treatment=self.treatment,
+            target_outcome=self.outcome,
+        )
+
     def _get_analysis_evaluator_info(self):
         # TODO: ExperimentResults responsibilities should be taken over by AnalysisEvaluator
         self.treatment = self.evaluator.treatment
@@ -44,21 +74,16 @@ class ExperimentResult:
     def _get_nontrivial_probes_info(self):
         self._get_filtered_probes_info(TrivialityChecker, False)
 
-    def _get_connected_probes_info(self):
-        self._get_filtered_probes_info(
-            checker_class=ConnectivityChecker,
-            valid=True,
-            graph_helper=self._graph_helper,
-            target_treatment=self.treatment,
-            target_outcome=self.outcome,
-        )
-
     def _get_filtered_probes_info(self, checker_class, valid, **checker_kwargs):
-        probes_filter = _ProbesFilter(self.probes, checker_class, valid, **checker_kwargs)
-        probes_filter.filter_probes()
+        probes_filter = self._filter_probes(checker_class, valid, **checker_kwargs)
         descriptor = checker_class.descriptor
         self._unpack_filter_results(probes_filter, descriptor, valid)
 
+    def _filter_probes(self, checker_class, valid, **checker_kwargs):
+        probes_filter = _ProbesFilter(self.probes, checker_class, valid, **checker_kwargs)
+        probes_filter.filter_probes()
+        return probes_filter
+
     def _unpack_filter_results(self, probes_filter, descriptor, valid):
         if not valid:
             descriptor = f"non{descriptor}"
@@ -81,9 +106,11 @@ class _GraphHelper:
     """
     def __init__(self, true_graph, discovered_graph):
         self._discovered_cause2e_graph = discovered_graph
-        self._true_cause2e_graph = Graph.from_edges(directed_edges=set(true_graph.edges), undirected_edges=set())
+        self._true_nx_graph = true_graph
         self._true_undirected_nx_graph = true_graph.to_undirected()
-        self.true_n_connected_components = nx.number_connected_components(self._true_undirected_nx_graph)
+        self._components = [frozenset(c) for c in nx.connected_components(self._true_undirected_nx_graph)]
+        self._component_ids = self._get_component_ids()
+        self.true_n_connected_components = len(self._components)
 
     def are_connected(self, node1, node2):
         """Checks if two nodes are connected.
@@ -92,10 +119,44 @@ class _GraphHelper:
             node1 (str): The name of the first node.
             node2 (str): The name of the second node.
         """
-        return node1 in self._get_connected_nodes(node2)
+        return self._component_ids[node1] == self._component_ids[node2]
+
+    def are_connected_many(self, pairs):
+        """Checks for several pairs of nodes if they are connected.
+
+        Args:
+            pairs (iterable): Tuples holding the names of two nodes.
+
+        Returns:
+            list: A boolean for each pair.
+        """
+        component_ids = self._component_ids
+        return [component_ids[node1] == component_ids[node2] for node1, node2 in pairs]
 
-    def _get_connected_nodes(self, node):
-        return nx.node_connected_component(self._true_undirected_nx_graph, node)
+    def connected_nodes(self, node):
+        """Returns all nodes that are connected to a node, including the node itself.
+
+        Args:
+            node (str): The name of the node.
+
+        Returns:
+            frozenset: The nodes in the (weakly) connected component of the node. The set is shared
+                between all nodes of the component and must not be modified.
+        """
+        return self._components[self._component_ids[node]]
+
+    def _get_component_ids(self):
+        # computed once per graph, so that each connectivity check is a lookup instead of a search
+        component_ids = {}
+        for i, component in enumerate(self._components):
+            for node in component:
+                component_ids[node] = i
+        return component_ids
+
+    @functools.cached_property
+    def _true_cause2e_graph(self):
+        # only needed for showing, and the edge view can be consumed without copying it into a set
+        return Graph.from_edges(directed_edges=self._true_nx_graph.edges, undirected_edges=set())
 
     def show_true_graph(self, save_path=None):
         """Shows the true causal graph."""
@@ -132,11 +193,10 @@ class _ProbesFilter:
         self._get_filtered_probes_ratio()
 
     def _get_filtered_probes(self):
-        self.filtered_probes = {k: v for k, v in self._probes.items() if self._check_probe(k, v)}
-
-    def _check_probe(self, probe_key, probe_val):
-        checker_instance = self._checker_class(probe_key, probe_val, **self._checker_kwargs)
-        return checker_instance.check_probe() == self._valid
+        # one batch check per filter lets the checkers share work between the probes
+        checks = self._checker_class.check_probes(self._probes, **self._checker_kwargs)
+        valid = self._valid
+        self.filtered_probes = {k: v for (k, v), check in zip(self._probes.items(), checks) if check == valid}
 
     def _get_n_filtered_probes(self):
         self.n_filtered_probes = len(self.filtered_probes)
@@ -17,7 +17,9 @@ trusted more if all the validation probes have been estimated correctly.
 """
 
 import os
+import copy
 import pickle
+import multiprocessing
 from networkx import NetworkXError
 from qprobing.data_generator import DataGenerator
 from qprobing.task_preparator import TaskPreparator
@@ -58,6 +60,36 @@ class ExperimentRunner:
             if i % 10 == 0:
                 print(f"{i} experiments done.")
 
+    def run_experiments_streaming(self, n_experiments, data_generation_specs, seeds_list, task_specs, out_path,
+                                  verbose=False, keep_vm=True):
+        """Runs multiple quantitative probing experiments and streams the results to a pkl file.
+
+        Each result is appended to the file as soon as its run is done, instead of being kept in the
+        results list. This keeps the memory usage constant and preserves the finished runs if a later run
+        crashes. The file can be read with experiment_evaluator.load_results.
+
+        Args:
+            n_experiments (int): The number of experiments to be run.
+            data_generation_specs (dict): Parameters for the data generation.
+            seeds_list (list): Contains seed dictionaries for each of the runs.
+            task_specs (dict): Parameters for the task generation.
+            out_path (str): The path of the pkl file. Results are appended if the file already exists.
+            verbose (bool, optional): Determines whether the result of each run is displayed. Defaults to False.
+            keep_vm (bool, optional): Determines whether we want to keep the
+                Java VM alive between runs. Defaults to True.
+        """
+        seeds_list = self._prepare_seeds_list(n_experiments, seeds_list)
+        with open(out_path, 'ab') as f:
+            for i, seeds in enumerate(seeds_list):
+                data_generation_specs['seeds'] = seeds
+                if i == len(seeds_list) - 1:
+                    keep_vm = False
+                self.run_experiment(data_generation_specs, task_specs, verbose, keep_vm)
+                pickle.dump(self.results_list.pop(), f, pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                if i % 10 == 0:
+                    print(f"{i} experiments done.")
+
     def save_results(self, filename):
         """Saves the result list to a pkl file.
 
@@ -135,5 +167,70 @@ class ExperimentRunner:
         }
 
 
+def run_experiments_in_parallel(data_path, data_generation_specs, seeds_list, task_specs, n_processes=None,
+                                max_runs_per_process=230, out_path=None):
+    """Runs quantitative probing experiments in parallel worker processes.
+
+    The experiments are independent, so the seeds are split into chunks that are run by separate
+    ExperimentRunners. Each chunk runs in a fresh process with its own Java VM, which cannot be
+    restarted within a process, and with its own data file.
+
+    Args:
+        data_path (str): The path of the data file. Each chunk appends its index to the file name.
+        data_generation_specs (dict): Parameters for the data generation.
+        seeds_list (list): Contains seed dictionaries for each of the runs.
+        task_specs (dict): Parameters for the task generation.
+        n_processes (int, optional): The number of worker processes. Defaults to None, meaning the
+            number of CPUs.
+        max_runs_per_process (int, optional): The maximum number of runs in one process, since the
+            Java VM becomes unstable after about 230 runs. Defaults to 230.
+        out_path (str, optional): The path of a pkl file. If given, each chunk streams its results to
+            its own pkl file, which appends the chunk index to the file name. Defaults to None, meaning
+            that the results are collected in memory.
+
+    Returns:
+        list: The results of all runs, in the order of the seeds, or the names of the chunk pkl files
+            if out_path is given.
+    """
+    n_processes = n_processes or os.cpu_count()
+    chunks = _split_seeds(seeds_list, n_processes, max_runs_per_process)
+    jobs = [
+        (_get_chunk_path(data_path, i), data_generation_specs, chunk, task_specs,
+         out_path and _get_chunk_path(out_path, i))
+        for i, chunk in enumerate(chunks)
+    ]
+    # maxtasksperchild=1 and chunksize=1 give each chunk its own process and hence its own Java VM
+    with multiprocessing.Pool(processes=min(n_processes, len(jobs) or 1), maxtasksperchild=1) as pool:
+        chunk_results = pool.map(_run_chunk, jobs, chunksize=1)
+    if out_path:
+        return chunk_results
+    return [result for results in chunk_results for result in results]
+
+
+def _get_chunk_path(path, chunk_index):
+    root, ext = os.path.splitext(path)
+    return f"{root}_{chunk_index}{ext}"
+
+
+def _split_seeds(seeds_list, n_processes, max_runs_per_process):
+    # as many chunks as processes, unless the chunks would get too long for one Java VM
+    if not seeds_list:
+        return []
+    n_chunks = max(min(n_processes, len(seeds_list)), -(-len(seeds_list) // max_runs_per_process))
+    chunk_size = -(-len(seeds_list) // n_chunks)
+    return [seeds_list[start:start + chunk_size] for start in range(0, len(seeds_list), chunk_size)]
+
+
+def _run_chunk(job):
+    data_path, data_generation_specs, seeds_list, task_specs, out_path = job
+    runner = ExperimentRunner(data_path)
+    data_generation_specs = copy.deepcopy(data_generation_specs)
+    if out_path:
+        runner.run_experiments_streaming(len(seeds_list), data_generation_specs, seeds_list, task_specs, out_path)
+        return out_path
+    runner.run_experiments(len(seeds_list), data_generation_specs, seeds_list, task_specs)
+    return runner.results_list
+
+
 class InvalidSeedsError(Exception):
     pass
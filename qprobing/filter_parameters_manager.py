@@ -4,7 +4,7 @@ The user can pass several static or variable filters for selecting quantitative
 need to be combined to create an array of filter conditions.
 """
 
-import itertools
+import functools
 import numpy as np
 
 
@@ -13,7 +13,8 @@ class FilterParametersManager():
 
     Attributes:
         output_dimensions: A tuple indicating the number of bins in each filter.
-        params_arr: The final numpy array of combined filtering conditions.
+        params_arr: The final numpy structured array of combined filtering conditions. Each filter
+            name is a field holding the 'lower_bound' and 'upper_bound' of the respective bin.
         variable_filter_names: A list containing all filters varying over several bins. These are
             used for checking if the filter criterion is useful for validating causal models.
         static_filter_names: A list containing all static filters. These are used to exclude
@@ -41,26 +42,34 @@ class FilterParametersManager():
 
     def _get_filter_params_list(self, filter_name, filter_params):
         n_bins = filter_params.get('n_bins', 1)
-        # TODO: use np.linspace instead of custom calculation
-        lower_bound = filter_params['lower_bound']
-        upper_bound = filter_params['upper_bound']
-        bin_size = (upper_bound - lower_bound) / n_bins
-        return [{filter_name: self._get_regular_bounds(lower_bound, bin_size, i)} for i in range(n_bins)]
-
-    @staticmethod
-    def _get_regular_bounds(lower_bound, bin_size, i):
-        return {'lower_bound': lower_bound + i * bin_size, 'upper_bound': lower_bound + (i + 1) * bin_size}
+        # linspace hits the upper bound exactly, whereas accumulating bin sizes can drift
+        edges = np.linspace(filter_params['lower_bound'], filter_params['upper_bound'], n_bins + 1)
+        return edges[:-1], edges[1:]
 
     def _get_expanded_filter_combinations(self):
-        product = itertools.product(*self._binned_params.values())
-        product_list = [self._combine_dicts_in_params(params) for params in product]
-        product_flat_arr = np.array(product_list)
-        product_arr = np.reshape(product_flat_arr, self.output_dimensions)
-        return product_arr
-
-    @staticmethod
-    def _combine_dicts_in_params(params):
-        return dict(i for d in params for i in d.items())
+        # one float grid per filter and bound instead of one dict per combination
+        filter_names = list(self._binned_params)
+        dtype = np.dtype([(name, _BOUNDS_DTYPE) for name in filter_names])
+        bins = [np.arange(len(lowers)) for lowers, _ in self._binned_params.values()]
+        bin_grids = np.meshgrid(*bins, indexing='ij')
+        params_arr = np.empty(bin_grids[0].shape if bin_grids else (), dtype=dtype)
+        for name, bin_grid in zip(filter_names, bin_grids):
+            lowers, uppers = self._binned_params[name]
+            params_arr[name]['lower_bound'] = lowers[bin_grid]
+            params_arr[name]['upper_bound'] = uppers[bin_grid]
+        return np.reshape(params_arr, self.output_dimensions)
+
+    def get_bin_edges(self, filter_name):
+        """Returns the edges of the filtering bins for a given filter name.
+
+        Args:
+            filter_name: A string indicating the name of the filter.
+
+        Returns:
+            A numpy array of length n_bins + 1. Bin i covers the closed interval from edge i to edge i + 1.
+        """
+        lowers, uppers = self._binned_params[filter_name]
+        return np.append(lowers, uppers[-1])
 
     def _get_variable_filter_names(self):
         # List instead of set is necessary because we need the ordering for the meshgrid
@@ -77,8 +86,51 @@ class FilterParametersManager():
         return {filter_name: self._get_lower_bounds_1d(filter_name) for filter_name in self.variable_filter_names}
 
     def _get_lower_bounds_1d(self, filter_name):
-        relevant_list = self._binned_params[filter_name]
-        return np.array([self._get_lower_bound(dic) for dic in relevant_list])
+        lowers, _ = self._binned_params[filter_name]
+        return lowers
+
+
+def get_filter_parameters_manager(filter_params_dict):
+    """Returns a FilterParametersManager for the given filters, reusing it for identical filter dicts.
+
+    The managers are shared between callers and must not be modified.
+
+    Args:
+        filter_params_dict: A dict containing entries of the form
+            {filter_name: {'lower_bound': x, 'upper_bound': y, 'n_bins': z}}
+    """
+    # the filter order defines the output dimensions, so only the inner dicts are sorted
+    key = tuple((name, tuple(sorted(params.items()))) for name, params in filter_params_dict.items())
+    try:
+        hash(key)
+    except TypeError:  # unhashable parameter values cannot be cached
+        return FilterParametersManager(filter_params_dict)
+    return _get_cached_manager(key)
+
+
+@functools.lru_cache(maxsize=32)
+def _get_cached_manager(key):
+    manager = FilterParametersManager({name: dict(params) for name, params in key})
+    # read-only arrays turn accidental modifications of the shared manager into errors
+    for arr in [manager.params_arr, *manager.lower_bounds.values(), *manager.lower_bounds_meshgrid]:
+        arr.setflags(write=False)
+    return manager
+
+
+def to_filter_params(params):
+    """Returns the filter parameters of one entry of a params_arr as a dict.
+
+    Args:
+        params: A numpy record from FilterParametersManager.params_arr.
+
+    Returns:
+        A dict of the form {filter_name: {'lower_bound': x, 'upper_bound': y}}, as expected by the
+        ExperimentEvaluator.
+    """
+    return {
+        name: {'lower_bound': params[name]['lower_bound'].item(), 'upper_bound': params[name]['upper_bound'].item()}
+        for name in params.dtype.names
+    }
+
 
-    def _get_lower_bound(self, dic):
-        return tuple(v['lower_bound'] for k, v in dic.items() if k in self.variable_filter_names)[0]
+_BOUNDS_DTYPE = np.dtype([('lower_bound', np.float64), ('upper_bound', np.float64)])
@@ -11,12 +11,22 @@ least 80% of the probes were located in the same component of the causal graph a
 effect.). The means can be plotted to illustrate the discovered tendencies.
 """
 
-import pickle
+import itertools
+from array import array
 import numpy as np
 from numpy import NaN
 import matplotlib.pyplot as plt
-from qprobing.experiment_evaluator import ExperimentEvaluator
-from qprobing.filter_parameters_manager import FilterParametersManager
+from qprobing.experiment_evaluator import (
+    ExperimentEvaluator,
+    UNPACKED_QUANTITIES,
+    load_results,
+    load_results_from_bytes,
+    load_results_per_file,
+    unpack_quantity,
+)
+from qprobing.experiment_result import ExperimentResult
+from qprobing.filter_parameters_manager import get_filter_parameters_manager, to_filter_params
+from qprobing._kernels import bin_sum_count
 
 
 class MetaEvaluator:
@@ -28,24 +38,78 @@ class MetaEvaluator:
     """
     def __init__(self, results_list):
         self._results_list = results_list
+        self._columns_source = None
 
     @classmethod
-    # TODO: Duplicate from experiment evaluator alternative constructor
     def from_pkl(cls, filename):
-        with open(filename, 'rb') as f:
-            results_list = pickle.load(f)
-        return cls(results_list)
+        return cls(load_results(filename))
 
     @classmethod
-    # TODO: Duplicate from experiment evaluator alternative constructor
-    def from_multiple_pkls(cls, filenames, filter_params={}):
-        results_list = []
-        for filename in filenames:
-            with open(filename, 'rb') as f:
-                results_list += pickle.load(f)
-        return cls(results_list)
+    def from_bytes(cls, raw):
+        """Creates a MetaEvaluator from the contents of a pkl file that has already been read.
+
+        Args:
+            raw: A bytes object holding the contents of the pkl file.
+        """
+        return cls(load_results_from_bytes(raw))
+
+    @classmethod
+    def from_parquet(cls, path):
+        """Creates a MetaEvaluator from the columns in a parquet file written by to_parquet.
+
+        The results themselves are not restored, so only the stored filters and unpacked quantities
+        can be aggregated.
+
+        Args:
+            path: A string or path indicating the parquet file.
+        """
+        import pyarrow.parquet as pq  # optional dependency, only needed for the columnar storage
+        table = pq.read_table(path)
+        meta_evaluator = cls(None)
+        meta_evaluator._columns = {name: table.column(name).to_numpy() for name in table.column_names}
+        meta_evaluator._n_rows = table.num_rows
+        return meta_evaluator
+
+    def to_parquet(self, path, columns=None):
+        """Stores the filter values and quantities of all ordinary results as columns in a parquet file.
+
+        Args:
+            path: A string or path indicating the parquet file.
+            columns: optional; A list of filter and quantity names to be stored. Defaults to None,
+                meaning all numeric result attributes and all unpacked quantities.
+        """
+        import pyarrow as pa  # optional dependency, only needed for the columnar storage
+        import pyarrow.parquet as pq
+        filter_names, quantity_names = _split_column_names(columns or PARQUET_COLUMNS)
+        self._ensure_columns(filter_names, quantity_names)
+        names = filter_names + quantity_names
+        pq.write_table(pa.table({name: self._columns[name] for name in names}), path)
+
+    @classmethod
+    def from_multiple_pkls(cls, filenames, filter_params=None, columns=None):
+        """Creates a MetaEvaluator from the results in several pickle files.
 
-    def boxplot_quantity_data(self, quantity_names, filter_params_dict, calculate_data=True, plotting_options=[]):
+        Args:
+            filenames: A list of paths to the pickle files.
+            filter_params: optional; Unused, kept for compatibility with the ExperimentEvaluator.
+            columns: optional; A list of filter and quantity names whose values should be extracted
+                while the files are read, e.g. ('hit_rate', 'n_edge_differences'). Later binnings over
+                these names do not need to revisit the results. Defaults to None.
+        """
+        results_list = []
+        file_columns = []
+        for file_results in load_results_per_file(filenames):
+            results_list.extend(file_results)
+            if columns:
+                file_evaluator = cls(file_results)
+                file_evaluator._ensure_columns(*_split_column_names(columns))
+                file_columns.append(file_evaluator)
+        meta_evaluator = cls(results_list)
+        if file_columns:
+            meta_evaluator._set_columns_from_parts(file_columns)
+        return meta_evaluator
+
+    def boxplot_quantity_data(self, quantity_names, filter_params_dict, calculate_data=True, plotting_options=None):
         """Boxplots the data of multiple quantities against the filter criteria.
 
         Args:
@@ -67,13 +131,13 @@ class MetaEvaluator:
         for name, options in zip(quantity_names, plotting_options):
             self._boxplot_single_quantity_data(name, filter_params_dict, options)
 
-    def _boxplot_single_quantity_data(self, quantity_name, filter_params_dict, plotting_options={}):
+    def _boxplot_single_quantity_data(self, quantity_name, filter_params_dict, plotting_options=None):
         if len(self._lower_bounds) == 1:
             self._boxplot_single_quantity_data_one_filter(quantity_name, plotting_options)
         else:
             raise VisualizationError("Boxplot not implemented for more than one filter")
 
-    def _boxplot_single_quantity_data_one_filter(self, quantity_name, plotting_options={}):
+    def _boxplot_single_quantity_data_one_filter(self, quantity_name, plotting_options=None):
         self._preprocess_data_for_boxplot
         relevant_data_batches, relevant_lower_bounds = self._preprocess_data_for_boxplot(
             quantity_name,
@@ -85,7 +149,8 @@ class MetaEvaluator:
         self._postprocess_single_filter_plot(quantity_name, plotting_options)
 
     def _preprocess_data_for_boxplot(self, quantity_name, plotting_options):
-        filter_name = list(self._lower_bounds)[0]
+        plotting_options = plotting_options or {}
+        filter_name = self._filter_names[0]
         lower_bounds = self._lower_bounds[filter_name]
         data_batches = self.quantity_data[quantity_name]
         min_data_points = plotting_options.get('min_data_points', 1)
@@ -93,14 +158,19 @@ class MetaEvaluator:
         return self._filter_data_for_boxplot(lower_bounds, data_batches, min_data_points, lb_offset)
 
     def _filter_data_for_boxplot(self, lower_bounds, data_batches, min_data_points, lb_offset):
-        nonempty_data_batches = [batch for batch in data_batches if not (type(batch) == float and np.isnan(batch))]
-        relevant_data_batches = [batch for batch in nonempty_data_batches if len(batch) >= min_data_points]
-        relevant_lower_bounds = [lb + lb_offset for lb, batch in zip(lower_bounds, data_batches)
-                                 if batch in relevant_data_batches]
+        # empty bins hold a NaN float instead of an array of data
+        is_relevant = np.fromiter(
+            (not isinstance(batch, float) and len(batch) >= min_data_points for batch in data_batches),
+            dtype=bool,
+            count=len(data_batches),
+        )
+        relevant_data_batches = [data_batches[i] for i in np.flatnonzero(is_relevant)]
+        relevant_lower_bounds = (np.asarray(lower_bounds)[is_relevant] + lb_offset).tolist()
         return relevant_data_batches, relevant_lower_bounds
 
     def _postprocess_single_filter_plot(self, quantity_name, plotting_options):
-        filter_name = list(self._lower_bounds)[0]
+        plotting_options = plotting_options or {}
+        filter_name = self._filter_names[0]
         x_default = f"{filter_name} lower bound"
         x_label = plotting_options.get('x_label', x_default)
         plt.xlabel(x_label)
@@ -119,7 +189,7 @@ class MetaEvaluator:
             print(f'Saving to {path}')
         plt.show(block=False)
 
-    def plot_quantity_means(self, quantity_names, filter_params_dict, calculate_means=True, plotting_options=[]):
+    def plot_quantity_means(self, quantity_names, filter_params_dict, calculate_means=True, plotting_options=None):
         """Plots the means of multiple quantities against the filter criteria.
 
         Args:
@@ -141,7 +211,7 @@ class MetaEvaluator:
         for name, options in zip(quantity_names, plotting_options):
             self._plot_single_quantity_means(name, filter_params_dict, options)
 
-    def _plot_single_quantity_means(self, quantity_name, filter_params_dict, plotting_options={}):
+    def _plot_single_quantity_means(self, quantity_name, filter_params_dict, plotting_options=None):
         if len(self._lower_bounds) == 1:
             self._plot_single_quantity_means_one_filter(quantity_name, plotting_options)
         elif len(self._lower_bounds) == 2:
@@ -149,13 +219,13 @@ class MetaEvaluator:
         else:  # TODO two float filters and one binary would work if we use color
             raise VisualizationError("Plot not implemented for more than two filters")
 
-    def _plot_single_quantity_means_one_filter(self, quantity_name, plotting_options={}):
-        filter_name = list(self._lower_bounds)[0]
+    def _plot_single_quantity_means_one_filter(self, quantity_name, plotting_options=None):
+        filter_name = self._filter_names[0]
         plt.scatter(self._lower_bounds[filter_name], self.quantity_means[quantity_name])
         self._postprocess_single_filter_plot(quantity_name, plotting_options)
 
     def _plot_single_quantity_means_two_filters(self, quantity_name):
-        filter_names = list(self._lower_bounds.keys())
+        filter_names = self._filter_names
         mesh_vals = self._lower_bounds_meshgrid
         fig = plt.figure()
         ax = fig.add_subplot(projection='3d')
@@ -166,7 +236,7 @@ class MetaEvaluator:
         plt.title(f"mean {quantity_name} grouped by {filter_names[0]} and {filter_names[1]}")
         plt.show(block=False)
 
-    def get_quantity_means(self, quantity_names, filter_params_dict):
+    def get_quantity_means(self, quantity_names, filter_params_dict, vectorized=True):
         """Calculates the means of multiple quantities with respect to the given filter criteria.
 
         Args:
@@ -174,27 +244,157 @@ class MetaEvaluator:
             filter_params_dict: A dict containing entries of the form
                 {filter_name: {'lower_bound': x, 'upper_bound': y, 'n_bins': z}}
                 The 'n_bins' entry can be omitted to create a static filter.
+            vectorized: optional; A boolean indicating if the means of the unpacked quantities
+                should be aggregated over all bins at once, instead of creating an
+                ExperimentEvaluator for each bin. Both give the same means. Defaults to True.
         """
         params_arr = self._prepare_params_arr(quantity_names, filter_params_dict, set_bounds=True)
-        evaluators = self._get_evaluators(params_arr)
-        self.quantity_means = {quantity: self._get_quantity_means(quantity, evaluators) for quantity in quantity_names}
+        if vectorized and UNPACKED_QUANTITIES.issuperset(quantity_names):
+            self.quantity_means = self._compute_means_vectorized(quantity_names, filter_params_dict)
+        else:
+            self._check_results_are_loaded()
+            evaluators = self._get_evaluators(params_arr)
+            self.quantity_means = {
+                quantity: self._get_quantity_means(quantity, evaluators) for quantity in quantity_names
+            }
+
+    def _compute_means_vectorized(self, quantity_names, filter_params_dict):
+        self._ensure_columns(filter_params_dict, quantity_names)
+        result_ids, bin_ids = self._get_bin_memberships(filter_params_dict)
+        n_bins = int(np.prod(self._output_dimensions))
+        quantity_means = {}
+        for quantity in quantity_names:
+            values = self._columns[quantity][result_ids].astype(np.float64)
+            has_value = ~np.isnan(values)  # mirrors the nanmean of the evaluators
+            sums, counts = bin_sum_count(values, bin_ids, has_value, n_bins)
+            means = sums / np.where(counts > 0, counts, NaN)
+            quantity_means[quantity] = means.reshape(self._output_dimensions)
+        return quantity_means
+
+    def _compute_data_vectorized(self, quantity_names, filter_params_dict):
+        self._ensure_columns(filter_params_dict, quantity_names)
+        groups = self._bin_results(filter_params_dict)
+        quantity_data = {}
+        for quantity in quantity_names:
+            values = self._columns[quantity]
+            quantity_data[quantity] = [values[group] if len(group) else NaN for group in groups]
+        return quantity_data
+
+    def _ensure_columns(self, filter_names, quantity_names):
+        # The filter values and quantities of a result do not depend on the bins, so they are extracted
+        # only once per results list and reused for all binnings.
+        if self._columns_source is not self._results_list:
+            self._columns_source = self._results_list
+            self._ordinary_results = [
+                ExperimentResult.from_result_dict(x) for x in self._results_list if not isinstance(x, Exception)
+            ]
+            self._columns = {}
+            self._n_rows = len(self._ordinary_results)
+        buffers = {name: array('d') for name in filter_names if name not in self._columns}
+        if buffers or any(name not in self._columns for name in quantity_names):
+            self._check_results_are_loaded()
+        if buffers:
+            for result in self._ordinary_results:
+                for name, buffer in buffers.items():
+                    buffer.append(getattr(result, name))
+            self._columns.update({name: np.frombuffer(buffer) for name, buffer in buffers.items()})
+        missing_quantities = [name for name in quantity_names if name not in self._columns]
+        if missing_quantities:
+            evaluators = [result.evaluator for result in self._ordinary_results]
+            self._columns.update({name: unpack_quantity(evaluators, name) for name in missing_quantities})
+
+    def _set_columns_from_parts(self, parts):
+        # Joins the columns of MetaEvaluators over consecutive chunks of self._results_list.
+        self._columns_source = self._results_list
+        self._ordinary_results = list(itertools.chain.from_iterable(part._ordinary_results for part in parts))
+        self._columns = {name: np.concatenate([part._columns[name] for part in parts]) for name in parts[0]._columns}
+        self._n_rows = len(self._ordinary_results)
+
+    def _check_results_are_loaded(self):
+        if self._results_list is None:
+            msg = 'The MetaEvaluator only holds the stored columns, the results have not been loaded. '\
+                  'Please restrict the aggregation to the stored filters and unpacked quantities.'
+            raise MissingColumnError(msg)
+
+    def _bin_results(self, filter_params_dict):
+        # Returns one array of result indices per flat bin, in the order of the results like in the evaluators.
+        result_ids, bin_ids = self._get_bin_memberships(filter_params_dict)
+        n_bins = int(np.prod(self._output_dimensions))
+        order = np.lexsort((result_ids, bin_ids))
+        splits = np.cumsum(np.bincount(bin_ids, minlength=n_bins))[:-1]
+        return np.split(result_ids[order], splits)
+
+    def _get_bin_memberships(self, filter_params_dict):
+        # Returns pairs of (result index, flat bin index). The bins are closed intervals like in the
+        # ResultsFilter, so a value on an inner edge belongs to both adjacent bins.
+        in_spec = np.ones(self._n_rows, dtype=bool)
+        first_bins, last_bins = [], []
+        for filter_name, filter_params in filter_params_dict.items():
+            values = self._columns[filter_name]
+            if 'n_bins' in filter_params:
+                in_range, first_bin, last_bin = self._get_bin_ranges(filter_name, values)
+                first_bins.append(first_bin)
+                last_bins.append(last_bin)
+            else:
+                in_range = (filter_params['lower_bound'] <= values) & (values <= filter_params['upper_bound'])
+            in_spec &= in_range
+        return self._flat_bin_ids(in_spec, first_bins, last_bins)
+
+    def _get_bin_ranges(self, filter_name, values):
+        # The bins are uniform, so rescaling finds the bin of each value in constant time. A single step
+        # against the exact edges corrects rounding and adds the neighbouring bin for values on an edge.
+        edges = self._filter_param_mgr.get_bin_edges(filter_name)
+        last_index = len(edges) - 2
+        in_range = (edges[0] <= values) & (values <= edges[-1])
+        values = np.where(in_range, values, edges[0])
+        bins = np.clip(np.floor((values - edges[0]) * self._inv_widths[filter_name]), 0, last_index).astype(np.intp)
+        bins -= (values < edges[bins]) & (bins > 0)
+        bins += (values > edges[bins + 1]) & (bins < last_index)
+        first_bin = bins - ((values == edges[bins]) & (bins > 0))
+        last_bin = bins + ((values == edges[bins + 1]) & (bins < last_index))
+        return in_range, first_bin, last_bin
+
+    def _flat_bin_ids(self, in_spec, first_bins, last_bins):
+        # A value on an inner edge is a member of two bins per filter, so all offset combinations are visited.
+        result_ids, bin_ids = [], []
+        for offsets in itertools.product((0, 1), repeat=len(first_bins)):
+            bins = [first_bin + offset for first_bin, offset in zip(first_bins, offsets)]
+            is_member = in_spec.copy()
+            for bin_, last_bin in zip(bins, last_bins):
+                is_member &= bin_ <= last_bin
+            members = np.flatnonzero(is_member)
+            result_ids.append(members)
+            bin_ids.append(np.ravel_multi_index(tuple(bin_[members] for bin_ in bins), self._output_dimensions))
+        return np.concatenate(result_ids), np.concatenate(bin_ids).astype(np.intp)
 
     def _prepare_params_arr(self, quantity_names, filter_params_dict, set_bounds=True):
-        filter_param_mgr = FilterParametersManager(filter_params_dict)
+        filter_param_mgr = get_filter_parameters_manager(filter_params_dict)
+        self._filter_param_mgr = filter_param_mgr
+        self._inv_widths = {
+            name: self._get_inv_bin_width(filter_params_dict[name]) for name in filter_param_mgr.variable_filter_names
+        }
         self._get_output_dimensions(filter_param_mgr)
         if set_bounds:
             self._set_bounds(filter_param_mgr)
         return filter_param_mgr.params_arr
 
+    def _get_inv_bin_width(self, filter_params):
+        width = filter_params['upper_bound'] - filter_params['lower_bound']
+        return filter_params['n_bins'] / width if width > 0 else 0.0
+
     def _set_bounds(self, filter_param_mgr):
         self._lower_bounds = filter_param_mgr.lower_bounds
+        self._filter_names = tuple(self._lower_bounds)  # the variable filters, read by every plot
         self._lower_bounds_meshgrid = filter_param_mgr.lower_bounds_meshgrid
 
     def _get_output_dimensions(self, filter_param_mgr):
         self._output_dimensions = filter_param_mgr.output_dimensions
 
     def _get_evaluators(self, params_arr):
-        return np.vectorize(self._get_evaluator)(params_arr)
+        evaluators = np.empty(params_arr.shape, dtype=object)
+        for index in np.ndindex(params_arr.shape):
+            evaluators[index] = self._get_evaluator(to_filter_params(params_arr[index]))
+        return evaluators
 
     def _get_evaluator(self, params):
         try:
@@ -203,9 +403,8 @@ class MetaEvaluator:
             return None
 
     def _get_quantity_means(self, quantity, evaluators):
-        def wrapped_fun(evaluator):
-            return self._get_quantity_mean(quantity, evaluator)
-        return np.vectorize(wrapped_fun)(evaluators)
+        means = (self._get_quantity_mean(quantity, evaluator) for evaluator in evaluators.ravel())
+        return np.fromiter(means, dtype=np.float64, count=evaluators.size).reshape(evaluators.shape)
 
     def _get_quantity_mean(self, quantity, evaluator):
         if evaluator:
@@ -213,7 +412,7 @@ class MetaEvaluator:
         else:
             return NaN
 
-    def get_quantity_data(self, quantity_names, filter_params_dict):
+    def get_quantity_data(self, quantity_names, filter_params_dict, vectorized=True):
         """Gets the data of multiple quantities with respect to the given filter criteria.
         Used for any plots that go beyond showing only the mean.
 
@@ -222,15 +421,22 @@ class MetaEvaluator:
             filter_params_dict: A dict containing entries of the form
                 {filter_name: {'lower_bound': x, 'upper_bound': y, 'n_bins': z}}
                 The 'n_bins' entry can be omitted to create a static filter.
+            vectorized: optional; A boolean indicating if the results of all bins should be grouped
+                in a single pass, instead of creating an ExperimentEvaluator for each bin. Defaults to True.
         """
         params_arr = self._prepare_params_arr(quantity_names, filter_params_dict, set_bounds=True)
         if len(self._lower_bounds) > 1:
             msg = 'Multiple multi-bin filters are not supported yet for full aggregation analysis.'\
                   'Please restrict the aggregation analysis to means only.'
             raise BinningError(msg)
+        elif vectorized and UNPACKED_QUANTITIES.issuperset(quantity_names):
+            self.quantity_data = self._compute_data_vectorized(quantity_names, filter_params_dict)
         else:
+            self._check_results_are_loaded()
             evaluators = self._get_evaluators(params_arr)
-        self.quantity_data = {quantity: self._get_quantity_data(quantity, evaluators) for quantity in quantity_names}
+            self.quantity_data = {
+                quantity: self._get_quantity_data(quantity, evaluators) for quantity in quantity_names
+            }
 
     def _get_quantity_data(self, quantity, evaluators):
         return [self._get_quantity_data_single(quantity, evaluator) for evaluator in evaluators]
@@ -242,9 +448,34 @@ class MetaEvaluator:
             return NaN
 
 
+PARQUET_COLUMNS = (
+    'n_nodes',
+    'hit_rate',
+    'correct_graph_found',
+    'effect_difference',
+    'relative_effect_difference',
+    'target_effect',
+    'n_nontrivial_probes',
+    'nontrivial_probes_ratio',
+    'n_connected_probes',
+    'connected_probes_ratio',
+    'true_n_connected_components',
+) + tuple(sorted(UNPACKED_QUANTITIES))
+
+
+def _split_column_names(names):
+    quantity_names = [name for name in names if name in UNPACKED_QUANTITIES]
+    filter_names = [name for name in names if name not in UNPACKED_QUANTITIES]
+    return filter_names, quantity_names
+
+
 class VisualizationError(Exception):
     pass
 
 
 class BinningError(Exception):
     pass
+
+
+class MissingColumnError(Exception):
+    pass
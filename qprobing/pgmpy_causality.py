@@ -1,9 +1,11 @@
 """This module provides the main functionality for determining causal effects from a model and/or data."""
 
+import weakref
 from abc import ABC, abstractmethod
-from pgmpy.inference import CausalInference
+from pgmpy.inference import VariableElimination
 from pgmpy.models import BayesianNetwork
 import networkx as nx
+import numpy as np
 
 
 def calculate_effect(model, treatment, outcome, n_samples=None):
@@ -11,11 +13,71 @@ def calculate_effect(model, treatment, outcome, n_samples=None):
     return calculator.determine_effect()
 
 
+def calculate_effects(model, pairs):
+    """Calculates the causal effects of several treatment-outcome pairs in the same model.
+
+    Trivial effects are answered from the cached reachability of the model without any pgmpy query,
+    and each distinct pair is calculated only once.
+
+    Args:
+        model: The pgmpy.BayesianNetwork used for data generation.
+        pairs: An iterable of (treatment, outcome) tuples.
+
+    Returns:
+        A dict mapping each (treatment, outcome) tuple to its causal effect.
+    """
+    return {
+        (treatment, outcome): calculate_effect(model, treatment, outcome)
+        for treatment, outcome in dict.fromkeys(pairs)
+    }
+
+
 def simulate_effect(model, treatment, outcome, n_samples):
     simulator = EffectSimulator(model, treatment, outcome, n_samples)
     return simulator.determine_effect()
 
 
+def clear_effect_cache(model=None):
+    """Discards cached inference results. Necessary after changing the structure or cpds of a model.
+
+    Args:
+        model: optional; The pgmpy.BayesianNetwork whose cache should be discarded. Defaults to None,
+            meaning the caches of all models.
+    """
+    models = [model] if model is not None else list(_cached_models)
+    for cached_model in models:
+        cached_model.__dict__.pop('_qprobing_cache', None)
+        _cached_models.discard(cached_model)
+
+
+def _get_model_cache(model):
+    # The cache lives on the model itself, so it is freed together with the model.
+    cache = model.__dict__.get('_qprobing_cache')
+    if cache is None:
+        cache = model._qprobing_cache = _ModelCache()
+    if not cache.is_registered:  # also true for the empty caches of unpickled models
+        _cached_models.add(model)
+        cache.is_registered = True
+    return cache
+
+
+# only used for clearing all caches, the weak references do not keep any model alive
+_cached_models = weakref.WeakSet()
+
+
+class _ModelCache:
+    """Holds the inference results that can be reused for all effects in the same model."""
+    def __init__(self):
+        self.is_registered = False
+        self.variable_elimination = None
+        self.adjusted_effects = {}
+        self.descendants = {}
+
+    def __reduce__(self):
+        # Pickled models (e.g. when sent to worker processes) do not carry the cached results.
+        return (_ModelCache, ())
+
+
 class EffectDeterminator(ABC):
     """Abstract Base Class for determining causal effects. Method is up to the subclasses.
 
@@ -37,20 +99,19 @@ class EffectDeterminator(ABC):
         return self._determine_nontrivial_effect()
 
     def _effect_is_trivial_zero(self):
-        return not nx.has_path(self.model, self.treatment, self.outcome)
+        # one search per treatment answers the path question for all outcomes in the same model
+        if self.treatment == self.outcome:
+            return False
+        descendants = _get_model_cache(self.model).descendants
+        if self.treatment not in descendants:
+            descendants[self.treatment] = frozenset(nx.descendants(self.model, self.treatment))
+        return self.outcome not in descendants[self.treatment]
 
     def _effect_is_trivial_one(self):
         return self.treatment == self.outcome
 
-    def _determine_nontrivial_effect(self):
-        interventional_means = {
-            do_value: self._determine_interventional_mean(do_value)
-            for do_value in {0, 1}
-        }
-        return interventional_means[1] - interventional_means[0]
-
     @abstractmethod
-    def _determine_interventional_mean(self, do_value):
+    def _determine_nontrivial_effect(self):
         pass
 
 
@@ -61,8 +122,8 @@ class EffectCalculator(EffectDeterminator):
         model: The pgmpy.BayesianNetwork used for data generation.
         treatment: A string indicating the treatment variable of the target causal effect.
         outcome: A string indicating the outcome variable of the target causal effect.
-        n_samples: An integer indicating the number of simulation samples to be used when
-            calculation is no possible.
+        n_samples: Deprecated and ignored, since all effects are calculated exactly without a
+            simulation fallback. Only kept for compatibility.
     """
     def __init__(self, model, treatment, outcome, n_samples=None):
         self.model = model
@@ -70,39 +131,31 @@ class EffectCalculator(EffectDeterminator):
         self.outcome = outcome
         self.n_samples = n_samples
 
-    def _determine_interventional_mean(self, do_value):
-        # pgmpy contains a bug that should be fixed in the next release
-        # appears when there is no direct edge between treatment and outcome
-        if self._effect_is_problematic():
-            return self._use_simulation_fallback(do_value)
-        else:
-            return self._determine_unproblematic_interventional_mean(do_value)
-
-    def _effect_is_problematic(self):
-        return not self._effect_is_trivial_zero() and not self._effect_is_trivial_one() and not self._has_direct_edge()
-
-    def _has_direct_edge(self):
-        return (self.treatment, self.outcome) in set(self.model.edges)
-
-    def _use_simulation_fallback(self, do_value):
-        print(
-            f"Using simulation fallback with {self.n_samples} samples for effect of {self.treatment} "
-            f"on {self.outcome} to avoid pgmpy bug."
-        )
-        if not self.n_samples:
-            raise SimulationFallbackError("Fallback not possible since no sample size was speficied at initialization.")
-        else:
-            simulator = EffectSimulator(self.model, self.treatment, self.outcome, self.n_samples)
-            return simulator._determine_interventional_mean(do_value)
-
-    def _determine_unproblematic_interventional_mean(self, do_value):
-        infer_adjusted = CausalInference(self.model)
-        query_result = infer_adjusted.query(
-            variables=[self.outcome],
-            do={self.treatment: do_value},
-            show_progress=False
+    def _determine_nontrivial_effect(self):
+        cache = _get_model_cache(self.model)
+        key = (self.treatment, self.outcome)
+        if key not in cache.adjusted_effects:
+            cache.adjusted_effects[key] = self._determine_adjusted_effect(cache)
+        return cache.adjusted_effects[key]
+
+    def _determine_adjusted_effect(self, cache):
+        # One joint query over outcome, treatment and its parents z replaces the two do-queries, since
+        # the parents block all backdoor paths: P(outcome=1 | do(treatment=x)) = sum_z P(outcome=1 | x, z) * P(z)
+        # Unlike the do-queries of pgmpy's CausalInference, this is also exact without a direct edge
+        # between treatment and outcome, so no simulation is needed.
+        adjustment_set = sorted(self.model.get_parents(self.treatment))
+        if cache.variable_elimination is None:
+            cache.variable_elimination = VariableElimination(self.model)
+        variables = [self.outcome, self.treatment] + adjustment_set
+        joint = cache.variable_elimination.query(variables=variables, joint=True, show_progress=False)
+        probs = np.transpose(joint.values, [joint.variables.index(var) for var in variables])
+        treatment_probs = probs.sum(axis=0)
+        adjustment_probs = treatment_probs.sum(axis=0)
+        outcome_probs = np.divide(
+            probs[1], treatment_probs, out=np.zeros_like(treatment_probs), where=treatment_probs > 0
         )
-        return query_result.values[1]
+        interventional_means = (outcome_probs * adjustment_probs).reshape(len(outcome_probs), -1).sum(axis=1)
+        return interventional_means[1] - interventional_means[0]
 
 
 # simulation recovery could be a fairer benchmark for cause2e estimation
@@ -121,6 +174,13 @@ class EffectSimulator(EffectDeterminator):
         self.outcome = outcome
         self.n_samples = n_samples
 
+    def _determine_nontrivial_effect(self):
+        interventional_means = {
+            do_value: self._determine_interventional_mean(do_value)
+            for do_value in {0, 1}
+        }
+        return interventional_means[1] - interventional_means[0]
+
     def _determine_interventional_mean(self, do_value):
         samples = self.model.simulate(
             n_samples=self.n_samples,
@@ -131,11 +191,16 @@ class EffectSimulator(EffectDeterminator):
 
     @staticmethod
     def _mean_from_simulated_samples(samples, var_name):
-        target_col = samples[var_name]
-        ones = target_col.value_counts()[1]
-        return ones / len(samples)
+        # counting directly avoids building a sorted value_counts Series and works without any ones
+        target_col = samples[var_name].to_numpy()
+        if not target_col.size:
+            return float('nan')
+        return np.count_nonzero(target_col == 1) / target_col.size
 
 
 class SimulationFallbackError(Exception):
-    """Exception that is raised when simulation fallback is not enabled, but calculation fails."""
+    """Exception that was raised when simulation fallback was not enabled, but calculation failed.
+
+    No longer raised, since all effects are calculated exactly. Only kept for compatibility.
+    """
     pass
@@ -9,6 +9,7 @@ Currently implemented are:
 """
 
 from abc import ABC, abstractmethod
+import numpy as np
 
 
 class ProbeChecker(ABC):
@@ -29,6 +30,34 @@ class ProbeChecker(ABC):
         """Implementing the check is the task of the child classes."""
         pass
 
+    @classmethod
+    def check(cls, probe_key, probe_val, **checker_kwargs):
+        """Checks a probe without keeping a checker instance around.
+
+        Child classes can override this with a direct implementation to skip the instantiation.
+
+        Args:
+            probe_key (tuple): The key of the probe.
+            probe_val (dict): The value of the probe.
+            **checker_kwargs: Additional arguments for the constructor of the checker.
+        """
+        return cls(probe_key, probe_val, **checker_kwargs).check_probe()
+
+    @classmethod
+    def check_probes(cls, probes, **checker_kwargs):
+        """Checks all probes of a probing run.
+
+        Child classes can override this to share work between the probes.
+
+        Args:
+            probes (dict): The probes, keyed like in the probing results.
+            **checker_kwargs: Additional arguments for the constructor of the checker.
+
+        Returns:
+            list: A boolean for each probe, in the order of the probes.
+        """
+        return [cls.check(k, v, **checker_kwargs) for k, v in probes.items()]
+
 
 class TrivialityChecker(ProbeChecker):
     """Main class for checking if a probe is trivial."""
@@ -41,16 +70,55 @@ class TrivialityChecker(ProbeChecker):
         Trivial means that either there is no path from treatment to outcome (trivially zero), or
         treatment and outcome are identical (trivially 1).
         """
-        return self._get_expected_lower_bound() in {0.9, -0.1}
+        return self.check(self._probe_key, self._probe_val)
+
+    @classmethod
+    def check(cls, probe_key, probe_val):
+        """Checks if a probe is trivial without instantiating a checker.
+
+        Args:
+            probe_key (tuple): The key of the probe.
+            probe_val (dict): The value of the probe.
+        """
+        return probe_val['Expected'][1] in {0.9, -0.1}
 
-    def _get_expected_lower_bound(self):
-        return self._probe_val['Expected'][1]
+    @classmethod
+    def check_probes(cls, probes):
+        """Checks if the probes are trivial.
+
+        Args:
+            probes (dict): The probes, keyed like in the probing results.
+
+        Returns:
+            list: A boolean for each probe, in the order of the probes.
+        """
+        return cls.filter_mask(list(probes.values())).tolist()
+
+    @staticmethod
+    def filter_mask(probe_vals):
+        """Checks which of the given probe values belong to trivial probes.
+
+        Args:
+            probe_vals (list): The values of the probes.
+
+        Returns:
+            numpy.ndarray: A boolean mask that is True for each trivial probe.
+        """
+        expected = np.fromiter((val['Expected'][1] for val in probe_vals), dtype=np.float64, count=len(probe_vals))
+        return (expected == 0.9) | (expected == -0.1)
 
 
 class ConnectivityChecker(ProbeChecker):
     """Main class for checking if a probe is connected to the target effect."""
 
     descriptor = 'connected'
+    # the nodes of the probe and the target effect in the order of _get_node_pairs
+    _pair_descriptions = (
+        ('treatment', 'treatment'),
+        ('treatment', 'outcome'),
+        ('outcome', 'treatment'),
+        ('outcome', 'outcome'),
+    )
 
     def __init__(self, probe_key, probe_val, target_treatment, target_outcome, graph_helper):
         super().__init__(probe_key, probe_val)
@@ -65,25 +133,61 @@ class ConnectivityChecker(ProbeChecker):
         effect treatment and target effect outcome.
         """
 
+        pairs = self._get_node_pairs()
+        if not verbose:
+            return all(self._graph_helper.are_connected_many(pairs))
+        for (probe_node, target_node), descriptions in zip(pairs, self._pair_descriptions):
+            if not self._graph_helper.are_connected(probe_node, target_node):
+                print(f'Probe {descriptions[0]} is not connected to target {descriptions[1]}!')
+                return False
+        return True
+
+    def _get_node_pairs(self):
         probe_treatment = self._get_treatment()
         probe_outcome = self._get_outcome()
-        if not self._graph_helper.are_connected(probe_treatment, self._target_treatment):
-            if verbose:
-                print('Probe treatment is not connected to target treatment!')
-            return False
-        if not self._graph_helper.are_connected(probe_treatment, self._target_outcome):
-            if verbose:
-                print('Probe treatment is not connected to target outcome!')
-            return False
-        if not self._graph_helper.are_connected(probe_outcome, self._target_treatment):
-            if verbose:
-                print('Probe outcome is not connected to target treatment!')
-            return False
-        if not self._graph_helper.are_connected(probe_outcome, self._target_outcome):
-            if verbose:
-                print('Probe outcome is not connected to target outcome!')
-            return False
-        return True
+        return (
+            (probe_treatment, self._target_treatment),
+            (probe_treatment, self._target_outcome),
+            (probe_outcome, self._target_treatment),
+            (probe_outcome, self._target_outcome),
+        )
+
+    @classmethod
+    def check(cls, probe_key, probe_val, target_treatment, target_outcome, graph_helper):
+        """Checks if a probe is connected to the target effect without instantiating a checker.
+
+        Args:
+            probe_key (tuple): The key of the probe.
+            probe_val (dict): The value of the probe.
+            target_treatment (str): The treatment of the target effect.
+            target_outcome (str): The outcome of the target effect.
+            graph_helper (_GraphHelper): Answers the connectivity queries on the true graph.
+        """
+        target_nodes = cls._get_target_nodes(target_treatment, target_outcome, graph_helper)
+        return probe_key[0] in target_nodes and probe_key[1] in target_nodes
+
+    @classmethod
+    def check_probes(cls, probes, target_treatment, target_outcome, graph_helper):
+        """Checks if the probes are connected to the target effect.
+
+        The nodes that are connected to the target effect are determined only once for all probes.
+
+        Args:
+            probes (dict): The probes, keyed like in the probing results.
+            target_treatment (str): The treatment of the target effect.
+            target_outcome (str): The outcome of the target effect.
+            graph_helper (_GraphHelper): Answers the connectivity queries on the true graph.
+
+        Returns:
+            list: A boolean for each probe, in the order of the probes.
+        """
+        target_nodes = cls._get_target_nodes(target_treatment, target_outcome, graph_helper)
+        return [key[0] in target_nodes and key[1] in target_nodes for key in probes]
+
+    @staticmethod
+    def _get_target_nodes(target_treatment, target_outcome, graph_helper):
+        # a probe node is connected to both target nodes if and only if it lies in both of their components
+        return graph_helper.connected_nodes(target_treatment) & graph_helper.connected_nodes(target_outcome)
 
     def _get_treatment(self):
         return self._probe_key[0]
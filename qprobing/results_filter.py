@@ -6,6 +6,10 @@ recommended to create a new ProbeChecker that allows the ExperimentResult class
 which can then be used for the filtering.
 """
 
+from itertools import compress
+from operator import attrgetter
+import numpy as np
+
 
 class ResultsFilter:
     """Main class for filtering quantitative probing results.
@@ -19,24 +23,40 @@ class ResultsFilter:
         self._attribute_name = attribute_name
         self._lower_bound = lower_bound
         self._upper_bound = upper_bound
+        self._getter = attrgetter(attribute_name)
+        self._predicate = self._get_predicate()
 
     def filter_results(self):
         """Filters the results by checking for each result whether the attribute lies within the bounds."""
-        self.filtered_results = [result for result in self._results if self._apply_filter_to_result(result)]
+        try:
+            keep = self._get_numeric_mask()
+        except (TypeError, ValueError):  # non-numeric attributes are compared one by one
+            predicate, getter = self._predicate, self._getter
+            self.filtered_results = [result for result in self._results if predicate(getter(result))]
+        else:
+            self.filtered_results = list(compress(self._results, keep.tolist()))
 
-    def _apply_filter_to_result(self, result):
-        self._attribute_val = getattr(result, self._attribute_name)
-        return self._compare_attribute_val_to_bounds()
+    def _get_numeric_mask(self):
+        # two array comparisons replace the attribute lookup and the comparison branches per result
+        vals = np.fromiter(map(self._getter, self._results), dtype=np.float64, count=len(self._results))
+        mask = np.ones(len(vals), dtype=bool)
+        if self._lower_bound is not None:
+            mask &= vals >= self._lower_bound
+        if self._upper_bound is not None:
+            mask &= vals <= self._upper_bound
+        return mask
 
-    def _compare_attribute_val_to_bounds(self):
-        has_lower_bound = self._lower_bound is not None  # is not None is necessary because 0 evaluates to False
-        has_upper_bound = self._upper_bound is not None
+    def _get_predicate(self):
+        # the bounds are resolved once, so that the comparison per result does not branch on them
+        lower_bound, upper_bound = self._lower_bound, self._upper_bound
+        has_lower_bound = lower_bound is not None  # is not None is necessary because 0 evaluates to False
+        has_upper_bound = upper_bound is not None
         if has_lower_bound and has_upper_bound:
-            return self._lower_bound <= self._attribute_val <= self._upper_bound
+            return lambda val: lower_bound <= val <= upper_bound
         elif not has_lower_bound and has_upper_bound:
-            return self._attribute_val <= self._upper_bound
+            return lambda val: val <= upper_bound
         elif has_lower_bound and not has_upper_bound:
-            return self._lower_bound <= self._attribute_val
+            return lambda val: lower_bound <= val
         else:
             raise NoBoundsError("You must specify at least one bound (upper or lower) to filter the results.")
 
@@ -9,7 +9,7 @@ knowledge (only present edges are currently supplied, not absent edges or tempor
 import random
 import itertools
 import networkx as nx
-from qprobing.pgmpy_causality import calculate_effect
+from qprobing.pgmpy_causality import calculate_effects
 
 
 class TaskPreparator:
@@ -19,19 +19,28 @@ class TaskPreparator:
         treatment: A string indicating the treatment variable for the target causal effect.
         outcome: A string indicating the outcome variable for the target causal effect.
         target_effect: A float indicating the value of the target causal effect.
-        hints: A set of edges from the true graph that are passed as domain knowledge to the
+        hints: A tuple of distinct edges from the true graph that are passed as domain knowledge to the
              learner.
         probes: A set of target effects that are used for quantitative probing.
     """
     def __init__(self, model, nx_graph, n_samples=1000):
+        # n_samples is deprecated and ignored, since all effects are calculated exactly without simulation
         # TODO: Why pass the graph when the model already holds the structural information?
         self._model = model
         self._nx_graph = nx_graph
-        self._n_samples = 1000
+        self._nodes = list(nx_graph.nodes)
+        self._edges = list(model.edges)
+        # one search per node answers all reachability questions for the probes and the target effect
+        self._reachable = {node: nx.descendants(nx_graph, node) for node in nx_graph.nodes}
+        # drawing from all nontrivial pairs replaces the rejection sampling, ordered by the nodes for seeded runs
+        self._nontrivial_pairs = [
+            (node, other) for node in self._nodes for other in self._nodes if other in self._reachable[node]
+        ]
+        self._effect_cache = {}
 
     @property
     def _n_variables(self):
-        return len(self._model.nodes)
+        return len(self._nodes)
 
     def prepare_task(self, p_hint, p_probe, tolerance):
         """Prepares target causal effect, edge hints and probes for the analysis.
@@ -46,35 +55,30 @@ class TaskPreparator:
                 test?
         """
         self.treatment, self.outcome = self._get_random_treatment_and_outcome(nontrivial=True)
-        self.target_effect = calculate_effect(self._model, self.treatment, self.outcome, self._n_samples)
+        self.target_effect = self._get_effects([(self.treatment, self.outcome)])[(self.treatment, self.outcome)]
         self._prepare_hints(p_hint)
         self._prepare_probes(p_probe, tolerance)
 
     def _get_random_treatment_and_outcome(self, nontrivial=True):
-        nx_nodes = list(self._nx_graph.nodes)
-        while True:
-            treatment, outcome = random.sample(nx_nodes, 2)
-            is_trivial = self._check_trivial_effect(treatment, outcome)
-            if not (nontrivial and is_trivial):
-                break
-        return treatment, outcome
+        if not nontrivial:
+            return tuple(random.sample(self._nodes, 2))
+        if not self._nontrivial_pairs:
+            raise NoNontrivialEffectError('The graph does not contain any directed path between two nodes.')
+        return random.choice(self._nontrivial_pairs)
 
     def _check_trivial_effect(self, treatment, outcome):
-        if treatment == outcome:
-            return True
-        else:
-            return not nx.has_path(self._nx_graph, treatment, outcome)
+        return treatment == outcome or outcome not in self._reachable[treatment]
 
     def _prepare_hints(self, p_hint):
-        edges = list(self._model.edges)
-        n_hints = int(p_hint * len(edges))
-        self.hints = set(random.sample(edges, n_hints))
+        n_hints = int(p_hint * len(self._edges))
+        self.hints = tuple(random.sample(self._edges, n_hints))  # random.sample never repeats an edge
 
     def _prepare_probes(self, p_probe, tolerance):
         # TODO: Do we have to adapt p_probe wrt to nontrivial effects? Yes, otherwise endless loop
         n_probes = int(p_probe * self._n_variables**2)
         probe_specs = self._get_probe_specs(n_probes)
-        self.probes = {self._create_probe_from_spec(spec, tolerance) for spec in probe_specs}
+        effects = self._get_effects(probe_specs)
+        self.probes = {self._create_probe_from_spec(spec, effects[spec], tolerance) for spec in probe_specs}
 
     def _get_probe_specs(self, n_probes):
         possible_specs = self._create_possible_probe_specs(nontrivial=False)
@@ -88,15 +92,27 @@ class TaskPreparator:
             return all_possible_specs
 
     def _create_all_possible_probe_specs(self):
-        nx_nodes = list(self._nx_graph.nodes)
-        return set(itertools.product(nx_nodes, nx_nodes))
+        # random.sample needs a sequence, and the pairs are unique by construction
+        return list(itertools.product(self._nodes, self._nodes))
 
     def _select_nontrivial_probe_specs(self, candidate_specs):
-        return {spec for spec in candidate_specs if not self._check_trivial_effect(*spec)}
+        nontrivial_specs = {(node, other) for node, reachable in self._reachable.items() for other in reachable}
+        return [spec for spec in candidate_specs if spec in nontrivial_specs]
+
+    def _get_effects(self, specs):
+        # The target effect is usually among the probes, and repeated preparations reuse all effects.
+        missing_specs = [spec for spec in specs if spec not in self._effect_cache]
+        if missing_specs:
+            self._effect_cache.update(calculate_effects(self._model, missing_specs))
+        return self._effect_cache
 
-    def _create_probe_from_spec(self, spec, tolerance):
+    def _create_probe_from_spec(self, spec, effect, tolerance):
         treatment, outcome = spec
-        effect = calculate_effect(self._model, treatment, outcome, self._n_samples)
         lower_bound = effect - tolerance
         upper_bound = effect + tolerance
         return ((treatment, outcome, 'nonparametric-ate'), ('between', lower_bound, upper_bound))
+
+
+class NoNontrivialEffectError(Exception):
+    """Exception that is raised when no target effect with a directed path can be drawn."""
+    pass
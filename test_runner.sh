@@ -3,15 +3,20 @@
 # base name for xml generation
 xml_base=build/tests/results
 
-# run all the tests that do not use the JVM
+# fixed hash seed, so that all test workers see the same test collection
+export PYTHONHASHSEED=0
+
+# run all the tests that do not use the JVM, distributed over all cores by test file
 pytest \
+-n auto \
+--dist loadfile \
 --cov=qprobing \
 --cov-report=xml:build/tests/coverage.xml \
 --junitxml=$xml_base.xml \
 tests/qprobing \
 -m "not uses_jvm"
 
-# specify all the other tests
+# specify all the other tests, which run one file per process because the JVM cannot be restarted
 special_tests=(
     "analysis_runner"
     "analysis_evaluator_random"
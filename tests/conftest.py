@@ -7,22 +7,35 @@ MODULE_DIR_PATH = os.path.dirname(os.path.realpath(__file__))
 site.addsitedir(os.path.join(MODULE_DIR_PATH, '..'))
 
 
+import matplotlib
+# a non-interactive backend, because the tests only check that the plotting code runs
+matplotlib.use('Agg')
+
+
 import pytest
 import pathlib
-from qprobing.data_generator import DataGenerator
+import matplotlib.pyplot as plt
+from qprobing.data_generator import DataGenerator, write_csv
 from qprobing.task_preparator import TaskPreparator
 from qprobing.experiment_evaluator import ExperimentEvaluator
+from qprobing.meta_evaluator import MetaEvaluator
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-slow', action='store_true', default=False, help='run the tests marked as slow')
 
 
-def pytest_collection_modifyitems(items):
-    """Sets the time limit for each test to x seconds."""
+def pytest_collection_modifyitems(config, items):
+    """Sets the time limit for each test to x seconds and skips slow tests unless requested."""
+    skip_slow = pytest.mark.skip(reason='slow test, use --run-slow to run it')
     for item in items:
         if item.get_closest_marker('timeout') is None:
             item.add_marker(pytest.mark.timeout(30))
+        if item.get_closest_marker('slow') is not None and not config.getoption('--run-slow'):
+            item.add_marker(skip_slow)
 
 
-@pytest.fixture
-def example_generator():
+def _create_example_generator():
     return DataGenerator.from_scratch(
         n_vars=5,
         p_edge=0.1,
@@ -31,41 +44,61 @@ def example_generator():
     )
 
 
-@pytest.fixture
-def example_model(example_generator):
-    example_generator.create_random_model(seed=1)
-    return example_generator.model
+@pytest.fixture(autouse=True)
+def _close_figures():
+    yield
+    plt.close('all')
 
 
 @pytest.fixture
-def example_nx_graph(example_generator):
-    example_generator.create_random_model(seed=1)
-    return example_generator.nx_graph
+def example_generator():
+    # function scope, because tests create models and data with other seeds on it
+    return _create_example_generator()
 
 
-@pytest.fixture
-def example_data(example_generator):
-    example_generator.create_random_model(seed=1)
-    example_generator.generate_data(
+@pytest.fixture(scope='session')
+def _example_session_generator():
+    generator = _create_example_generator()
+    generator.create_random_model(seed=1)
+    generator.generate_data(
         n_samples=1000,
         seed=1,
     )
-    return example_generator.data
+    return generator
 
 
-@pytest.fixture
-def example_data_path(example_generator):
-    path = pathlib.Path.cwd() / 'tests' / 'qprobing' / 'fixtures' / 'example_data.csv'
-    example_generator.create_random_model(seed=1)
-    example_generator.generate_data(
-        n_samples=1000,
-        seed=1,
-        save_to_file=path,
-    )
+@pytest.fixture(scope='session')
+def example_model(_example_session_generator):
+    return _example_session_generator.model
+
+
+@pytest.fixture(scope='session')
+def example_nx_graph(_example_session_generator):
+    return _example_session_generator.nx_graph
+
+
+@pytest.fixture(scope='session')
+def example_data(_example_session_generator):
+    return _example_session_generator.data
+
+
+@pytest.fixture(scope='session')
+def _example_data_file(example_data, tmp_path_factory):
+    # a separate file for each session, so that parallel test workers do not share it
+    path = tmp_path_factory.mktemp('data') / 'example_data.csv'
+    write_csv(example_data, path)
     return path
 
 
 @pytest.fixture
+def example_data_path(_example_data_file, example_data):
+    # experiment runs delete their data file, so it is rewritten from the cached data if necessary
+    if not _example_data_file.exists():
+        write_csv(example_data, _example_data_file)
+    return _example_data_file
+
+
+@pytest.fixture(scope='session')
 def example_preparator(example_model, example_nx_graph):
     preparator = TaskPreparator(example_model, example_nx_graph)
     preparator.prepare_task(
@@ -76,11 +109,22 @@ def example_preparator(example_model, example_nx_graph):
     return preparator
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def evaluator(pickle_path):
     return ExperimentEvaluator.from_pkl(pickle_path)
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def pickle_path():
     return pathlib.Path.cwd() / 'tests' / 'qprobing' / 'fixtures' / '10_runs_06-04_16-32.pkl'
+
+
+@pytest.fixture(scope='session')
+def pickle_bytes(pickle_path):
+    return pathlib.Path(pickle_path).read_bytes()
+
+
+@pytest.fixture
+def meta_evaluator(pickle_bytes):
+    # unpickled for each test, because the tests change the evaluator, but read only once per session
+    return MetaEvaluator.from_bytes(pickle_bytes)
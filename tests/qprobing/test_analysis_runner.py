@@ -1,6 +1,6 @@
 import pytest
 import faulthandler
-from qprobing.analysis_runner import AnalysisRunner
+from qprobing.analysis_runner import AnalysisRunner, run_sweep
 
 
 @pytest.mark.uses_jvm
@@ -8,6 +8,13 @@ def test_run_analysis(example_data_path, example_preparator):
     run_test_analysis(example_data_path, example_preparator, keep_vm=False)
 
 
+@pytest.mark.uses_jvm
+def test_run_sweep(example_data_path, example_preparator):
+    evaluators = run_sweep([(example_data_path, example_preparator)] * 2, n_jobs=2)
+    assert len(evaluators) == 2
+    assert evaluators[0].target_effect == example_preparator.target_effect
+
+
 @pytest.mark.skip(reason="Running discovery in a separate process makes this obsolete.")
 def test_run_analysis_vm_timeout(example_data_path, example_preparator):
     with pytest.raises(RuntimeError):
@@ -39,9 +46,7 @@ def test_constructor_equivalence(example_preparator):
         probes=example_preparator.probes,
     )
     # TODO: use this for data_generator and maybe implement it as __eq__ in the class itself?
-    attribute_names = vars(from_task_preparator).keys() | vars(from_default_constructor).keys()
-    for name in attribute_names:
-        assert getattr(from_task_preparator, name) == getattr(from_default_constructor, name)
+    assert vars(from_task_preparator) == vars(from_default_constructor)
 
 
 def test_bad_path(example_preparator):
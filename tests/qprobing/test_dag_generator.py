@@ -1,5 +1,6 @@
 import pytest
-from qprobing.dag_generator import DagGenerator, get_nodes_from_edges, IsolatedNodeError
+import networkx as nx
+from qprobing.dag_generator import DagGenerator, get_nodes_from_edges
 
 
 @pytest.fixture
@@ -36,10 +37,21 @@ def dag_generator():
 def test_create_random_dag(dag_generator):
     dag_generator.create_random_dag(force_n_vars=True, show=False)
     assert dag_generator.n_vars == len(dag_generator.nodes)
+    assert dag_generator._is_acyclic()
+    assert not dag_generator._has_isolated_nodes()
 
 
 def test_create_random_dag_allow_isolated(dag_generator):
     dag_generator.create_random_dag(force_n_vars=False, show=False)
-    with pytest.raises(IsolatedNodeError):
-        dag_generator._check_isolated_nodes()
+    assert dag_generator._has_isolated_nodes()
     assert dag_generator.n_vars > len(dag_generator.nodes)
+
+
+def test_create_random_dag_acyclic_sampling():
+    dag_generators = [DagGenerator(n_vars=5, p_edge=0.5, seed=1, max_count=100) for _ in range(2)]
+    for dag_generator in dag_generators:
+        dag_generator.create_random_dag(force_n_vars=True, show=False, acyclic_sampling=True)
+        assert nx.is_directed_acyclic_graph(dag_generator.nx_graph)
+        assert dag_generator.n_vars == len(dag_generator.nodes)
+        assert dag_generator.cyclic_graph_errors == 0
+    assert dag_generators[0].edges == dag_generators[1].edges
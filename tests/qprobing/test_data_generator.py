@@ -1,6 +1,10 @@
+import sys
+import itertools
 import pytest
+import numpy as np
+import pandas as pd
 import networkx as nx
-from qprobing.data_generator import DataGenerator, MissingModelError
+from qprobing.data_generator import DataGenerator, MissingModelError, InvalidBackendError, write_csv
 
 
 def test_constructor_equivalence(example_generator):
@@ -81,3 +85,60 @@ def _generate_data_with_seed(example_generator, seed):
         save_to_file=None,
     )
     return example_generator.data.copy()
+
+
+def test_simulation_backends_agree(example_generator):
+    example_generator.create_random_model(seed=1)
+    means = {}
+    for backend in ['numpy', 'pgmpy']:
+        example_generator.generate_data(n_samples=20000, seed=1, backend=backend)
+        means[backend] = example_generator.data.mean()
+    assert set(means['numpy'].index) == set(means['pgmpy'].index)
+    assert (abs(means['numpy'] - means['pgmpy'][means['numpy'].index]) < 0.03).all()
+
+
+def test_numpy_backend_matches_cpds(example_generator):
+    example_generator.create_random_model(seed=1)
+    example_generator.generate_data(n_samples=50000, seed=1, backend='numpy')
+    data = example_generator.data
+    cpds = example_generator.model.get_cpds()
+    # the parent order of multi-parent cpds is where the sampler could go wrong
+    assert any(len(cpd.variables) > 2 for cpd in cpds)
+    for cpd in cpds:
+        evidence = cpd.variables[1:]
+        probs = cpd.get_values()[1]
+        # the columns of a TabularCPD enumerate the evidence states with the first variable changing slowest
+        for column, states in enumerate(itertools.product([0, 1], repeat=len(evidence))):
+            mask = np.ones(len(data), dtype=bool)
+            for parent, state in zip(evidence, states):
+                mask &= data[parent].to_numpy() == state
+            n_matches = np.count_nonzero(mask)
+            assert n_matches > 0
+            frequency = data[cpd.variable].to_numpy()[mask].mean()
+            standard_error = np.sqrt(probs[column] * (1 - probs[column]) / n_matches)
+            assert abs(frequency - probs[column]) < 4 * standard_error + 0.01
+
+
+def test_generate_data_invalid_backend(example_generator):
+    example_generator.create_random_model(seed=1)
+    with pytest.raises(InvalidBackendError):
+        example_generator.generate_data(n_samples=10, backend='foo')
+
+
+def test_save_to_file(example_generator, tmp_path):
+    path = tmp_path / 'data.csv'
+    example_generator.create_random_model(seed=1)
+    example_generator.generate_data(n_samples=100, seed=1, save_to_file=path)
+    loaded = pd.read_csv(path, index_col=0)
+    assert (loaded.values == example_generator.data.values).all()
+    assert list(loaded.columns) == list(example_generator.data.columns)
+
+
+def test_write_csv_backends_agree(example_data, tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow.csv')
+    write_csv(example_data, tmp_path / 'pyarrow.csv')
+    # a None entry in sys.modules makes the import fail, so that pandas writes the file
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    monkeypatch.setitem(sys.modules, 'pyarrow.csv', None)
+    write_csv(example_data, tmp_path / 'pandas.csv')
+    assert (tmp_path / 'pyarrow.csv').read_bytes() == (tmp_path / 'pandas.csv').read_bytes()
@@ -1,6 +1,9 @@
+import copy
+import pickle
+import pytest
 import numpy as np
 from numpy import NaN
-from qprobing.experiment_evaluator import ExperimentEvaluator
+from qprobing.experiment_evaluator import ExperimentEvaluator, NotCachedError, load_results
 
 
 def test_show_full_info(evaluator):
@@ -16,12 +19,60 @@ def test_show_all_plots(evaluator):
 
 
 def test_get_mean(evaluator):
+    evaluator = copy.copy(evaluator)  # the fixture is shared by the whole session
     input_list = [1, NaN, 1]
     evaluator._dummy_attribute = input_list
     assert np.isnan(sum(input_list) / len(input_list))
     assert evaluator.get_mean('dummy_attribute') == 1
 
 
+def test_npz_cache(pickle_path, tmp_path):
+    filter_params = {
+        'connected_probes_ratio': {'lower_bound': 0.3},
+    }
+    evaluator = ExperimentEvaluator.from_pkl(pickle_path, filter_params, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('*.npz'))) == 1
+    cached_evaluator = ExperimentEvaluator.from_pkl(pickle_path, filter_params, cache_dir=tmp_path)
+    assert not hasattr(cached_evaluator, '_valid_results')
+    assert cached_evaluator._n_valid_results == evaluator._n_valid_results
+    assert cached_evaluator._n_nodes == evaluator._n_nodes
+    for quantity in ['hit_rates', 'relative_effect_differences', 'correct_graph_founds', 'n_edge_differences']:
+        np.testing.assert_array_equal(cached_evaluator.get_data(quantity), evaluator.get_data(quantity))
+    ExperimentEvaluator.from_pkl(pickle_path, {}, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('*.npz'))) == 2
+
+
+def test_npz_cache_returns_the_same_kind_of_evaluator(pickle_path, tmp_path):
+    first_evaluator = ExperimentEvaluator.from_pkl(pickle_path, cache_dir=tmp_path)
+    second_evaluator = ExperimentEvaluator.from_pkl(pickle_path, cache_dir=tmp_path)
+    assert type(first_evaluator) is type(second_evaluator)
+    for cached_evaluator in [first_evaluator, second_evaluator]:
+        cached_evaluator.show_full_info()
+        with pytest.raises(NotCachedError, match='npz cache'):
+            cached_evaluator.show_invalid_results()
+        with pytest.raises(NotCachedError):
+            cached_evaluator.get_data('edge_differences')
+
+
+def test_load_streamed_results(pickle_path, tmp_path):
+    results_list = load_results(pickle_path)
+    stream_path = tmp_path / 'stream.pkl'
+    with open(stream_path, 'wb') as f:
+        for result in results_list:
+            pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+    streamed_evaluator = ExperimentEvaluator.from_pkl(stream_path)
+    evaluator = ExperimentEvaluator.from_pkl(pickle_path)
+    assert len(load_results(stream_path)) == len(results_list)
+    assert streamed_evaluator._n_valid_results == evaluator._n_valid_results
+    np.testing.assert_array_equal(streamed_evaluator.get_data('hit_rates'), evaluator.get_data('hit_rates'))
+
+
+def test_init_with_unbounded_filter_params(pickle_path):
+    full_evaluator = ExperimentEvaluator.from_pkl(pickle_path)
+    unbounded_evaluator = ExperimentEvaluator.from_pkl(pickle_path, {'hit_rate': {}})
+    assert unbounded_evaluator._n_valid_results == full_evaluator._n_valid_results
+
+
 def test_init_with_filter_params(pickle_path):
     filter_params = {
         'connected_probes_ratio': {'lower_bound': 0.3},
@@ -1,4 +1,6 @@
 import pytest
+from qprobing.experiment_result import ExperimentResult
+from qprobing.probe_checkers import TrivialityChecker, ConnectivityChecker
 
 
 @pytest.fixture
@@ -20,6 +22,63 @@ def test_connected_probes_ratio(result):
     assert 0.3 < result.connected_probes_ratio < 0.4  # helps to see if connectivity is inverted
 
 
+def test_graph_helper_is_built_on_first_access(result):
+    fresh_result = ExperimentResult(result.evaluator)
+    assert '_graph_helper' not in vars(fresh_result)
+    assert fresh_result.connected_probes_ratio == result.connected_probes_ratio
+    assert fresh_result.n_connected_probes == result.n_connected_probes
+    assert '_graph_helper' in vars(fresh_result)
+
+
+def test_checker_classmethods_match_instances(result):
+    kwargs = {
+        'target_treatment': result.treatment,
+        'target_outcome': result.outcome,
+        'graph_helper': result._graph_helper,
+    }
+    for key, val in result.probes.items():
+        assert TrivialityChecker.check(key, val) == TrivialityChecker(key, val).check_probe()
+        assert ConnectivityChecker.check(key, val, **kwargs) == ConnectivityChecker(key, val, **kwargs).check_probe()
+
+
+def test_check_probes_matches_single_checks(result):
+    kwargs = {
+        'target_treatment': result.treatment,
+        'target_outcome': result.outcome,
+        'graph_helper': result._graph_helper,
+    }
+    for checker_class, checker_kwargs in [(TrivialityChecker, {}), (ConnectivityChecker, kwargs)]:
+        checks = checker_class.check_probes(result.probes, **checker_kwargs)
+        assert checks == [checker_class.check(k, v, **checker_kwargs) for k, v in result.probes.items()]
+
+
+def test_triviality_filter_mask():
+    probe_vals = [{'Expected': (0.0, value)} for value in [0.9, -0.1, 0.5, 0.0, 1.0]]
+    mask = TrivialityChecker.filter_mask(probe_vals)
+    assert mask.tolist() == [True, True, False, False, False]
+    assert TrivialityChecker.filter_mask([]).shape == (0,)
+
+
+def test_verbose_connectivity_check(result, capsys):
+    kwargs = {
+        'target_treatment': result.treatment,
+        'target_outcome': result.outcome,
+        'graph_helper': result._graph_helper,
+    }
+    for key, val in result.probes.items():
+        checker = ConnectivityChecker(key, val, **kwargs)
+        assert checker.check_probe(verbose=True) == checker.check_probe()
+        assert ('not connected' in capsys.readouterr().out) != checker.check_probe()
+
+
+def test_connected_nodes(result):
+    graph_helper = result._graph_helper
+    for node in result.true_graph.nodes:
+        connected_nodes = graph_helper.connected_nodes(node)
+        assert node in connected_nodes
+        assert all(graph_helper.are_connected(node, other) == (other in connected_nodes) for other in result.true_graph)
+
+
 def test_true_n_connected_components(result):
     assert result.true_n_connected_components == 2
 
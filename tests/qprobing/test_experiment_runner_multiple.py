@@ -1,5 +1,6 @@
 import pytest
-from qprobing.experiment_runner import ExperimentRunner
+from qprobing.experiment_evaluator import load_results
+from qprobing.experiment_runner import ExperimentRunner, run_experiments_in_parallel, _split_seeds
 
 
 @pytest.mark.uses_jvm
@@ -33,3 +34,39 @@ def test_run_experiments(example_data_path):
         task_specs,
         verbose=True,
     )
+
+
+@pytest.mark.parametrize("n_seeds, n_processes, max_runs, expected_lengths", [
+    (10, 4, 230, [3, 3, 3, 1]),
+    (3, 8, 230, [1, 1, 1]),
+    (500, 1, 230, [167, 167, 166]),
+    (0, 4, 230, []),
+])
+def test_split_seeds(n_seeds, n_processes, max_runs, expected_lengths):
+    seeds_list = [{'dag_seed': i} for i in range(n_seeds)]
+    chunks = _split_seeds(seeds_list, n_processes, max_runs)
+    assert [len(chunk) for chunk in chunks] == expected_lengths
+    assert [seeds for chunk in chunks for seeds in chunk] == seeds_list
+
+
+@pytest.mark.uses_jvm
+def test_run_experiments_in_parallel(tmp_path):
+    seeds_list = [{'dag_seed': i + 10, 'cpd_seed': i, 'simulation_seed': i} for i in range(2)]
+    data_generation_specs = {'n_vars': 5, 'n_samples': 1000, 'p_edge': 0.1, 'seeds': None, 'show': False}
+    task_specs = {'p_hint': 0.3, 'p_probe': 0.5, 'tolerance': 0.1}
+    results_list = run_experiments_in_parallel(
+        str(tmp_path / 'dag_data.csv'), data_generation_specs, seeds_list, task_specs, n_processes=2
+    )
+    assert len(results_list) == 2
+
+
+@pytest.mark.uses_jvm
+def test_run_experiments_streaming(example_data_path, tmp_path):
+    seeds_list = [{'dag_seed': i + 10, 'cpd_seed': i, 'simulation_seed': i} for i in range(2)]
+    data_generation_specs = {'n_vars': 5, 'n_samples': 1000, 'p_edge': 0.1, 'seeds': None, 'show': False}
+    task_specs = {'p_hint': 0.3, 'p_probe': 0.5, 'tolerance': 0.1}
+    out_path = tmp_path / 'results.pkl'
+    runner = ExperimentRunner(example_data_path)
+    runner.run_experiments_streaming(2, data_generation_specs, seeds_list, task_specs, out_path)
+    assert runner.results_list == []
+    assert [result['seeds'] for result in load_results(out_path)] == seeds_list
@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from qprobing.filter_parameters_manager import FilterParametersManager
+from qprobing.filter_parameters_manager import FilterParametersManager, get_filter_parameters_manager, to_filter_params
 
 
 @pytest.fixture
@@ -43,3 +43,54 @@ def test_get_lower_bounds_1d(filter_param_mgr):
 def test_get_variable_filter_names(filter_param_mgr):
     assert filter_param_mgr.variable_filter_names == ['n_nontrivial_probes', 'hit_rate']
     assert filter_param_mgr.static_filter_names == ['correct_graph_found']
+
+
+def test_params_arr(filter_param_mgr):
+    params_arr = filter_param_mgr.params_arr
+    assert params_arr.shape == filter_param_mgr.output_dimensions
+    assert (params_arr['hit_rate']['lower_bound'][1] == np.linspace(start=0, stop=0.9, num=10)).all()
+    assert (params_arr['correct_graph_found']['upper_bound'] == 1).all()
+    assert to_filter_params(params_arr[2, 0]) == {
+        'n_nontrivial_probes': {'lower_bound': 1 + 2 * 7 / 3, 'upper_bound': 1 + 3 * 7 / 3},
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 0.1},
+        'correct_graph_found': {'lower_bound': 0, 'upper_bound': 1},
+    }
+
+
+def test_last_upper_bound_is_exact():
+    filter_param_mgr = FilterParametersManager({'hit_rate': {'lower_bound': 0, 'upper_bound': 0.3, 'n_bins': 3}})
+    assert filter_param_mgr.params_arr['hit_rate']['upper_bound'][-1] == 0.3
+
+
+def test_get_filter_parameters_manager():
+    filter_params_dict = {
+        'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+    }
+    filter_param_mgr = get_filter_parameters_manager(filter_params_dict)
+    assert get_filter_parameters_manager(dict(filter_params_dict)) is filter_param_mgr
+    reordered = get_filter_parameters_manager(dict(reversed(filter_params_dict.items())))
+    assert reordered is not filter_param_mgr
+    assert reordered.output_dimensions == (10, 3)
+
+
+def test_cached_manager_is_read_only():
+    filter_param_mgr = get_filter_parameters_manager({
+        'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+    })
+    arrays = [
+        filter_param_mgr.params_arr,
+        *filter_param_mgr.lower_bounds.values(),
+        *filter_param_mgr.lower_bounds_meshgrid,
+    ]
+    for arr in arrays:
+        with pytest.raises(ValueError):
+            arr[...] = 0
+
+
+def test_unhashable_filter_params_are_not_cached():
+    filter_params_dict = {'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 2, 'tags': ['a']}}
+    filter_param_mgr = get_filter_parameters_manager(filter_params_dict)
+    assert get_filter_parameters_manager(filter_params_dict) is not filter_param_mgr
+    assert filter_param_mgr.params_arr.flags.writeable
@@ -0,0 +1,29 @@
+import pytest
+import numpy as np
+from qprobing import _kernels
+
+
+def test_bin_sum_count_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.random(1000)
+    bin_ids = rng.integers(0, 7, size=1000)
+    mask = rng.random(1000) > 0.3
+    sums, counts = _kernels.bin_sum_count(values, bin_ids, mask, 8)
+    expected_sums, expected_counts = _kernels._bin_sum_count_numpy(values, bin_ids, mask, 8)
+    assert np.allclose(sums, expected_sums)
+    assert np.array_equal(counts, expected_counts)
+    assert counts[7] == 0
+
+
+def test_bin_sum_count_without_numba(monkeypatch):
+    monkeypatch.setattr(_kernels, 'numba', None)
+    sums, counts = _kernels.bin_sum_count(np.array([1.0, 2.0, 4.0]), np.array([0, 2, 2]), np.array([1, 1, 0]), 3)
+    assert np.array_equal(sums, [1.0, 0.0, 2.0])
+    assert np.array_equal(counts, [1, 0, 1])
+
+
+def test_bin_sum_count_with_numba():
+    pytest.importorskip('numba')
+    sums, counts = _kernels.bin_sum_count(np.array([1.0, 2.0, 4.0]), np.array([0, 2, 2]), np.array([1, 1, 0]), 3)
+    assert np.array_equal(sums, [1.0, 0.0, 2.0])
+    assert np.array_equal(counts, [1, 0, 1])
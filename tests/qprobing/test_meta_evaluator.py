@@ -1,22 +1,22 @@
 import pytest
 import numpy as np
-from numpy import NaN, isclose
-from qprobing.meta_evaluator import MetaEvaluator, VisualizationError, BinningError
+from numpy import NaN
+from qprobing.meta_evaluator import MetaEvaluator, VisualizationError, BinningError, MissingColumnError
 from qprobing.filter_parameters_manager import FilterParametersManager
 
 
-def test_plot_quantity_means_single_filter(pickle_path):
+def test_plot_quantity_means_single_filter(meta_evaluator):
     _plot_quantity_means(
-        pickle_path,
+        meta_evaluator,
         filter_params_dict={
             'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
         },
     )
 
 
-def test_plot_quantity_means_two_filters(pickle_path):
+def test_plot_quantity_means_two_filters(meta_evaluator):
     _plot_quantity_means(
-        pickle_path,
+        meta_evaluator,
         filter_params_dict={
             'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
             'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
@@ -24,10 +24,10 @@ def test_plot_quantity_means_two_filters(pickle_path):
     )
 
 
-def test_plot_quantity_means_too_many_filters(pickle_path):
+def test_plot_quantity_means_too_many_filters(meta_evaluator):
     with pytest.raises(VisualizationError):
         _plot_quantity_means(
-            pickle_path,
+            meta_evaluator,
             filter_params_dict={
                 'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
                 'true_n_connected_components': {'lower_bound': 0, 'upper_bound': 5, 'n_bins': 5},
@@ -36,25 +36,24 @@ def test_plot_quantity_means_too_many_filters(pickle_path):
         )
 
 
-def _plot_quantity_means(pickle_path, filter_params_dict):
-    meta_evaluator = MetaEvaluator.from_pkl(pickle_path)
+def _plot_quantity_means(meta_evaluator, filter_params_dict):
     quantity_names = ['relative_effect_differences', 'n_edge_differences']
     meta_evaluator.plot_quantity_means(quantity_names, filter_params_dict)
 
 
-def test_boxplot_quantity_data_single_filter(pickle_path):
+def test_boxplot_quantity_data_single_filter(meta_evaluator):
     _boxplot_quantity_data(
-        pickle_path,
+        meta_evaluator,
         filter_params_dict={
             'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
         },
     )
 
 
-def test_boxplot_quantity_data_too_many_filters(pickle_path):
+def test_boxplot_quantity_data_too_many_filters(meta_evaluator):
     with pytest.raises(BinningError):
         _boxplot_quantity_data(
-            pickle_path,
+            meta_evaluator,
             filter_params_dict={
                 'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
                 'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
@@ -62,25 +61,22 @@ def test_boxplot_quantity_data_too_many_filters(pickle_path):
         )
 
 
-def _boxplot_quantity_data(pickle_path, filter_params_dict):
-    meta_evaluator = MetaEvaluator.from_pkl(pickle_path)
+def _boxplot_quantity_data(meta_evaluator, filter_params_dict):
     quantity_names = ['relative_effect_differences', 'n_edge_differences']
     meta_evaluator.boxplot_quantity_data(quantity_names, filter_params_dict)
 
 
 @pytest.mark.skip(reason="weird ValueError in scatter, made function private")
-def test_plot_single_quantity_means_single_filter(pickle_path):
+def test_plot_single_quantity_means_single_filter(meta_evaluator):
     quantity_name = 'n_edge_differences'
     filter_params_dict = {
         'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
     }
-    meta_evaluator = MetaEvaluator.from_pkl(pickle_path)
     meta_evaluator.get_quantity_means([quantity_name], filter_params_dict)
     meta_evaluator._plot_single_quantity_means(quantity_name, filter_params_dict)
 
 
-def test_get_quantity_means_single_filter(pickle_path):
-    meta_evaluator = MetaEvaluator.from_pkl(pickle_path)
+def test_get_quantity_means_single_filter(meta_evaluator):
     meta_evaluator.get_quantity_means(
         quantity_names=['relative_effect_differences', 'n_edge_differences'],
         filter_params_dict={
@@ -96,11 +92,10 @@ def test_get_quantity_means_single_filter(pickle_path):
 
 
 def _compare_arrays_with_nans(arr1, arr2, tolerance=0.1):
-    assert isclose(arr1, arr2, atol=0.1, equal_nan=True).all()
+    assert np.allclose(arr1, arr2, atol=tolerance, equal_nan=True)
 
 
-def test_get_quantity_means_multiple_filters(pickle_path):
-    meta_evaluator = MetaEvaluator.from_pkl(pickle_path)
+def test_get_quantity_means_multiple_filters(meta_evaluator):
     meta_evaluator.get_quantity_means(
         quantity_names=['relative_effect_differences', 'n_edge_differences'],
         filter_params_dict={
@@ -114,8 +109,7 @@ def test_get_quantity_means_multiple_filters(pickle_path):
     assert calculated_n_edge_differences.shape == (3, 10)
 
 
-def test_get_quantity_means_multiple_filters_with_static_filter(pickle_path):
-    meta_evaluator = MetaEvaluator.from_pkl(pickle_path)
+def test_get_quantity_means_multiple_filters_with_static_filter(meta_evaluator):
     meta_evaluator.get_quantity_means(
         quantity_names=['relative_effect_differences', 'n_edge_differences'],
         filter_params_dict={
@@ -128,31 +122,156 @@ def test_get_quantity_means_multiple_filters_with_static_filter(pickle_path):
     assert calculated_n_edge_differences.shape == (3, 10)
 
 
-def test_get_output_dimensions(pickle_path):
-    _check_dims(
-        pickle_path,
-        filter_params_dict={
-            'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
-            'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
-        },
-        expected_dims=(3, 10),
-    )
+@pytest.mark.parametrize('filter_params_dict', [
+    {
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+    },
+    {
+        'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+        'correct_graph_found': {'lower_bound': 0, 'upper_bound': 1},
+    },
+])
+def test_get_quantity_means_vectorized_matches_evaluators(meta_evaluator, filter_params_dict):
+    quantity_names = ['relative_effect_differences', 'hit_rates', 'correct_graph_founds', 'n_edge_differences']
+    meta_evaluator.get_quantity_means(quantity_names, filter_params_dict, vectorized=True)
+    vectorized_means = meta_evaluator.quantity_means
+    meta_evaluator.get_quantity_means(quantity_names, filter_params_dict, vectorized=False)
+    for quantity in quantity_names:
+        assert np.allclose(vectorized_means[quantity], meta_evaluator.quantity_means[quantity], equal_nan=True)
 
 
-def test_get_output_dimensions_with_static_filter(pickle_path):
-    _check_dims(
-        pickle_path,
-        filter_params_dict={
-            'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
-            'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
-            'correct_graph_found': {'lower_bound': 0, 'upper_bound': 1},
-        },
-        expected_dims=(3, 10),
+def test_get_quantity_data_vectorized_matches_evaluators(meta_evaluator):
+    quantity_names = ['relative_effect_differences', 'correct_graph_founds', 'n_edge_differences']
+    filter_params_dict = {
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+        'correct_graph_found': {'lower_bound': 0, 'upper_bound': 1},
+    }
+    meta_evaluator.get_quantity_data(quantity_names, filter_params_dict, vectorized=True)
+    vectorized_data = meta_evaluator.quantity_data
+    meta_evaluator.get_quantity_data(quantity_names, filter_params_dict, vectorized=False)
+    for quantity in quantity_names:
+        for vectorized_batch, batch in zip(vectorized_data[quantity], meta_evaluator.quantity_data[quantity]):
+            assert np.array_equal(vectorized_batch, batch, equal_nan=True)
+            assert np.asarray(vectorized_batch).dtype == np.asarray(batch).dtype
+
+
+def test_columns_are_rebuilt_for_new_results(meta_evaluator):
+    filter_params_dict = {'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10}}
+    meta_evaluator.get_quantity_means(['n_edge_differences'], filter_params_dict)
+    columns = meta_evaluator._columns
+    meta_evaluator.get_quantity_means(['hit_rates'], filter_params_dict)
+    assert meta_evaluator._columns is columns
+    meta_evaluator._results_list = meta_evaluator._results_list[:5]
+    meta_evaluator.get_quantity_means(['n_edge_differences'], filter_params_dict)
+    assert meta_evaluator._columns is not columns
+    assert len(meta_evaluator._columns['hit_rate']) <= 5
+
+
+def test_get_bin_ranges_matches_closed_intervals():
+    filter_params_dict = {'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10}}
+    meta_evaluator = MetaEvaluator([])
+    meta_evaluator._prepare_params_arr([], filter_params_dict)
+    edges = meta_evaluator._filter_param_mgr.get_bin_edges('hit_rate')
+    values = np.concatenate([edges, np.nextafter(edges, -1), np.nextafter(edges, 2), [0.35, NaN]])
+    in_range, first_bin, last_bin = meta_evaluator._get_bin_ranges('hit_rate', values)
+    for value, is_in_range, first, last in zip(values, in_range, first_bin, last_bin):
+        member_bins = [i for i in range(10) if edges[i] <= value <= edges[i + 1]]
+        assert is_in_range == bool(member_bins)
+        if member_bins:
+            assert [first, last] == [member_bins[0], member_bins[-1]]
+
+
+def test_from_multiple_pkls_with_columns(pickle_path):
+    quantity_names = ['relative_effect_differences', 'n_edge_differences']
+    filter_params_dict = {
+        'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+    }
+    meta_evaluator = MetaEvaluator.from_multiple_pkls(
+        [pickle_path, pickle_path],
+        columns=['hit_rate', 'n_nontrivial_probes', 'n_edge_differences'],
     )
+    assert len(meta_evaluator._columns['hit_rate']) == len(meta_evaluator._ordinary_results)
+    meta_evaluator.get_quantity_means(quantity_names, filter_params_dict)
+    expected = MetaEvaluator.from_multiple_pkls([pickle_path, pickle_path])
+    expected.get_quantity_means(quantity_names, filter_params_dict, vectorized=False)
+    for quantity in quantity_names:
+        assert np.allclose(meta_evaluator.quantity_means[quantity], expected.quantity_means[quantity], equal_nan=True)
+
+
+def test_from_bytes_matches_from_pkl(pickle_path, pickle_bytes):
+    quantity_names = ['relative_effect_differences', 'n_edge_differences']
+    filter_params_dict = {'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10}}
+    from_bytes = MetaEvaluator.from_bytes(pickle_bytes)
+    from_pkl = MetaEvaluator.from_pkl(pickle_path)
+    assert len(from_bytes._results_list) == len(from_pkl._results_list)
+    from_bytes.get_quantity_means(quantity_names, filter_params_dict)
+    from_pkl.get_quantity_means(quantity_names, filter_params_dict)
+    for quantity in quantity_names:
+        assert np.allclose(from_bytes.quantity_means[quantity], from_pkl.quantity_means[quantity], equal_nan=True)
+
+
+def test_filter_data_for_boxplot():
+    lower_bounds = np.array([0.0, 0.25, 0.5, 0.75])
+    data_batches = [NaN, np.array([1.0]), np.array([1.0, 2.0]), NaN]
+    meta_evaluator = MetaEvaluator([])
+    batches, bounds = meta_evaluator._filter_data_for_boxplot(lower_bounds, data_batches, 2, 0.1)
+    assert len(batches) == 1 and batches[0] is data_batches[2]
+    assert bounds == [0.6]
+    batches, bounds = meta_evaluator._filter_data_for_boxplot(lower_bounds, data_batches, 1, 0)
+    assert bounds == [0.25, 0.5]
+
+
+def test_parquet_round_trip(meta_evaluator, tmp_path):
+    pytest.importorskip('pyarrow')
+    quantity_names = ['relative_effect_differences', 'n_edge_differences']
+    filter_params_dict = {
+        'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
+        'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+        'correct_graph_found': {'lower_bound': 0, 'upper_bound': 1},
+    }
+    meta_evaluator.to_parquet(tmp_path / 'results.parquet')
+    meta_evaluator.get_quantity_means(quantity_names, filter_params_dict)
+    restored = MetaEvaluator.from_parquet(tmp_path / 'results.parquet')
+    restored.get_quantity_means(quantity_names, filter_params_dict)
+    for quantity in quantity_names:
+        assert np.allclose(restored.quantity_means[quantity], meta_evaluator.quantity_means[quantity], equal_nan=True)
+    with pytest.raises(MissingColumnError):
+        restored.get_quantity_means(quantity_names, filter_params_dict, vectorized=False)
+    with pytest.raises(MissingColumnError):
+        restored.get_quantity_means(quantity_names, {'n_nodes_unknown': {'lower_bound': 0, 'upper_bound': 1}})
+
+
+_DIM_FILTER_A = {
+    'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
+    'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+}
+_DIM_FILTER_B = {
+    'n_nontrivial_probes': {'lower_bound': 1, 'upper_bound': 8, 'n_bins': 3},
+    'hit_rate': {'lower_bound': 0, 'upper_bound': 1, 'n_bins': 10},
+    'correct_graph_found': {'lower_bound': 0, 'upper_bound': 1},
+}
+
+
+@pytest.fixture(scope='module')
+def filter_mgr_a():
+    return FilterParametersManager(_DIM_FILTER_A)
+
+
+@pytest.fixture(scope='module')
+def filter_mgr_b():
+    return FilterParametersManager(_DIM_FILTER_B)
+
+
+def test_get_output_dimensions(meta_evaluator, filter_mgr_a):
+    _check_dims(meta_evaluator, filter_mgr_a, expected_dims=(3, 10))
+
+
+def test_get_output_dimensions_with_static_filter(meta_evaluator, filter_mgr_b):
+    _check_dims(meta_evaluator, filter_mgr_b, expected_dims=(3, 10))
 
 
-def _check_dims(pickle_path, filter_params_dict, expected_dims):
-    meta_evaluator = MetaEvaluator.from_pkl(pickle_path)
-    filter_param_mgr = FilterParametersManager(filter_params_dict)
+def _check_dims(meta_evaluator, filter_param_mgr, expected_dims):
     meta_evaluator._get_output_dimensions(filter_param_mgr)
     assert meta_evaluator._output_dimensions == expected_dims
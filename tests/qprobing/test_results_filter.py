@@ -2,41 +2,55 @@ import pytest
 from qprobing.results_filter import ResultsFilter, NoBoundsError
 
 
-@pytest.fixture
-def test_vals():
-    return [-1, 0, 1]
+@pytest.mark.parametrize("val", [-1, 0, 1])
+def test_bounds_have_to_be_checked_against_none(val):
+    # None bounds cannot be compared and a bound of 0 is falsy, so only 'is None' detects missing bounds
+    assert val is not None
+    assert bool(val) == (val != 0)
+    with pytest.raises(TypeError):
+        None < val
 
 
-def test_comparison_with_none(test_vals):
-    for val in test_vals:
-        with pytest.raises(TypeError):
-            None < val
-        with pytest.raises(TypeError):
-            None > val
+def test_invalid_bounds_fail_at_construction():
+    with pytest.raises(NoBoundsError):
+        ResultsFilter(results=[], attribute_name='val')
 
 
-def test_bool_evals(test_vals):
-    for val in test_vals:
-        assert val is not None
-    assert not 0
+@pytest.mark.parametrize("lower_bound, upper_bound", [(None, 1), (-1, None), (-1, 1)])
+def test_predicate_accepts_value_within_bounds(lower_bound, upper_bound):
+    assert _get_predicate(lower_bound, upper_bound)(0)
 
 
-def test_compare_attribute_val_to_invalid_bounds():
-    with pytest.raises(NoBoundsError):
-        _compare_attribute_val_to_bounds(None, None)
+@pytest.mark.parametrize("lower_bound, upper_bound", [(None, -1), (1, None), (1, -1)])
+def test_predicate_rejects_value_outside_bounds(lower_bound, upper_bound):
+    assert not _get_predicate(lower_bound, upper_bound)(0)
 
 
-@pytest.mark.parametrize("lower_bound, upper_bound", [(None, 1), (-1, None), (-1, 1)])
-def test_successfully_compare_attribute_val_to_valid_bounds(lower_bound, upper_bound):
-    assert _compare_attribute_val_to_bounds(lower_bound, upper_bound)
+def _get_predicate(lower_bound, upper_bound):
+    results_filter = ResultsFilter(results=[], attribute_name='val', lower_bound=lower_bound, upper_bound=upper_bound)
+    return results_filter._predicate
 
 
-@pytest.mark.parametrize("lower_bound, upper_bound", [(None, -1), (1, None), (1, -1)])
-def test_unsuccessfully_compare_attribute_val_to_valid_bounds(lower_bound, upper_bound):
-    assert not _compare_attribute_val_to_bounds(lower_bound, upper_bound)
+class _Result:
+    def __init__(self, val):
+        self.val = val
 
 
-def _compare_attribute_val_to_bounds(lower_bound, upper_bound):
-    results_filter = ResultsFilter(results=[], attribute_name='', lower_bound=lower_bound, upper_bound=upper_bound)
-    results_filter._attribute_val = 0
-    return results_filter._compare_attribute_val_to_bounds()
+@pytest.mark.parametrize("lower_bound, upper_bound", [(None, 1), (-1, None), (-1, 0.5), (0, 0)])
+def test_filter_results_matches_single_comparisons(lower_bound, upper_bound):
+    results = [_Result(val) for val in [-2, -1, 0, 0.5, 1, 2, float('nan'), True]]
+    results_filter = ResultsFilter(results, 'val', lower_bound, upper_bound)
+    results_filter.filter_results()
+    assert results_filter.filtered_results == [r for r in results if results_filter._predicate(r.val)]
+
+
+def test_filter_results_with_non_numeric_attribute():
+    results = [_Result(val) for val in ['a', 'b', 'c']]
+    results_filter = ResultsFilter(results, 'val', 'b', None)
+    results_filter.filter_results()
+    assert [r.val for r in results_filter.filtered_results] == ['b', 'c']
+
+
+def test_filter_without_bounds_fails_at_construction():
+    with pytest.raises(NoBoundsError):
+        ResultsFilter([_Result(0)], 'val')
@@ -1,12 +1,28 @@
+import copy
+import itertools
 import pytest
-from qprobing.task_preparator import TaskPreparator
+import networkx as nx
+from qprobing.task_preparator import TaskPreparator, NoNontrivialEffectError
 
 
-@pytest.fixture
-def example_preparator(example_model, example_nx_graph):
+@pytest.fixture(scope='session')
+def _preparator_template(example_model, example_nx_graph):
     return TaskPreparator(example_model, example_nx_graph)
 
 
+@pytest.fixture
+def example_preparator(_preparator_template):
+    # prepare_task only assigns new attributes, so a shallow copy isolates the tests from each other.
+    # The effect cache is shared on purpose, since the effects of the model never change.
+    return copy.copy(_preparator_template)
+
+
+def test_preparator_copies_share_the_model(example_preparator, _preparator_template):
+    example_preparator.prepare_task(p_hint=0.5, p_probe=0.5, tolerance=0.1)
+    assert example_preparator._model is _preparator_template._model
+    assert not hasattr(_preparator_template, 'probes')
+
+
 def test_prepare_task(example_preparator):
     example_preparator.prepare_task(
         p_hint=0.5,
@@ -80,3 +96,39 @@ def test_prepare_task_too_many_probes(example_preparator):
     )
     assert not example_preparator.hints  # no remains of failed preparation interfere with new preparation
     assert example_preparator.probes
+
+
+def test_check_trivial_effect(example_preparator, example_nx_graph):
+    nodes = list(example_nx_graph.nodes)
+    for treatment, outcome in itertools.product(nodes, nodes):
+        is_trivial = treatment == outcome or not nx.has_path(example_nx_graph, treatment, outcome)
+        assert example_preparator._check_trivial_effect(treatment, outcome) == is_trivial
+
+
+def test_select_nontrivial_probe_specs(example_preparator, example_nx_graph):
+    nodes = list(example_nx_graph.nodes)
+    all_specs = list(itertools.product(nodes, nodes))
+    specs = example_preparator._select_nontrivial_probe_specs(all_specs)
+    assert specs == [spec for spec in all_specs if not example_preparator._check_trivial_effect(*spec)]
+
+
+def test_effects_are_cached(example_preparator, example_nx_graph, monkeypatch):
+    nodes = list(example_nx_graph.nodes)
+    specs = [(nodes[0], nodes[1]), (nodes[1], nodes[1])]
+    effects = {spec: example_preparator._get_effects(specs)[spec] for spec in specs}
+    monkeypatch.setattr('qprobing.task_preparator.calculate_effects', None)  # a second calculation would fail
+    assert {spec: example_preparator._get_effects(specs)[spec] for spec in specs} == effects
+
+
+def test_random_treatment_and_outcome_is_nontrivial(example_preparator):
+    for _ in range(20):
+        treatment, outcome = example_preparator._get_random_treatment_and_outcome(nontrivial=True)
+        assert not example_preparator._check_trivial_effect(treatment, outcome)
+
+
+def test_random_treatment_and_outcome_without_paths(example_model):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(example_model.nodes)
+    preparator = TaskPreparator(example_model, graph)
+    with pytest.raises(NoNontrivialEffectError):
+        preparator._get_random_treatment_and_outcome(nontrivial=True)